@@ -5,7 +5,7 @@ from datetime import datetime
 from upath import UPath
 
 
-@dataclass
+@dataclass(slots=True)
 class AssetMetadata:
     """Richer metadata for lineage and cataloging"""
     asset_key: str
@@ -29,9 +29,12 @@ class AssetMetadata:
     runtime_seconds: Optional[float] = None
     
     def compute_checksum(self) -> str:
-        """Compute checksum for data validation"""
+        """Compute checksum for data validation, streaming in 1 MiB chunks"""
+        digest = hashlib.md5()
         with UPath(self.storage_path).open('rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
     
     def to_catalog_entry(self) -> dict:
         """For DuckDB catalog"""
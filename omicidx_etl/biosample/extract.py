@@ -1,13 +1,19 @@
 """
 Simplified biosample/bioproject extraction without Prefect dependencies.
 """
+import contextlib
+import hashlib
+import io
+import os
+import queue
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import httpx
 import tempfile
-import gzip
 import orjson
-import shutil
+import rapidgzip
+import zstandard
 from upath import UPath
 from pathlib import Path
 from omicidx.biosample import BioSampleParser, BioProjectParser
@@ -17,54 +23,187 @@ import tenacity
 from datetime import datetime
 
 from .asset_metadata import AssetMetadata
+from .lxml_parser import LxmlBioSampleParser
 
 logger = get_logger(__name__)
 
 # Configuration
 BIO_SAMPLE_URL = "https://ftp.ncbi.nlm.nih.gov/biosample/biosample_set.xml.gz"
 BIO_PROJECT_URL = "https://ftp.ncbi.nlm.nih.gov/bioproject/bioproject.xml"
-OUTPUT_SUFFIX = ".jsonl.gz"
+OUTPUT_SUFFIX = ".jsonl.zst"
+LEGACY_OUTPUT_SUFFIX = ".jsonl.gz"
 
 # Heartbeat interval (seconds)
 HEARTBEAT_INTERVAL = 60
 
+# Bound on the parse -> write queue; provides backpressure if the writer
+# falls behind the parser.
+PARSE_QUEUE_SIZE = 8192
+
+# Sentinel signalling end-of-stream on the parse queue
+_EOF = object()
+
+# Number of serialized records joined into a single gzip write call
+WRITE_BATCH_SIZE = 4096
+
+# Multipart part size for object-store uploads; fsspec's default parts
+# are small and uploaded with little concurrency, which throttles the
+# tail of the pipeline.
+UPLOAD_BLOCK_SIZE = 64 << 20
+
+def open_anonymous_tmp(dir: str | None = None):
+    """Open a writable temp file with no directory entry where possible.
+
+    On Linux, O_TMPFILE gives an unlinked inode: no dentry is created and
+    the kernel reclaims the file when the descriptor closes, skipping the
+    create/unlink metadata churn of a named temp file. Elsewhere (or on
+    filesystems without O_TMPFILE support) this falls back to
+    ``NamedTemporaryFile``, which behaves identically for our purposes.
+    """
+    if dir is None:
+        dir = tempfile.gettempdir()
+    o_tmpfile = getattr(os, "O_TMPFILE", None)
+    if o_tmpfile is not None:
+        try:
+            fd = os.open(dir, o_tmpfile | os.O_RDWR, 0o600)
+            return os.fdopen(fd, "w+b")
+        except OSError:
+            pass
+    return tempfile.NamedTemporaryFile(dir=dir)
+
+
 @tenacity.retry(
     wait=tenacity.wait_exponential(multiplier=1, min=4, max=30),
     retry=tenacity.retry_if_exception_type(httpx.RequestError),
     stop=tenacity.stop_after_attempt(5),
 )
-def url_download(url: str, download_filename: str) -> None:
-    """Download a file from a URL to a local destination."""
+def url_download(url: str, download_file) -> str:
+    """Download a URL into an open writable binary file object.
 
-    try:
-        logger.info(f"Downloading {url} to {download_filename}")
-        with open(download_filename, "wb") as download_file:
-            with httpx.stream("GET", url, timeout=60) as response:
-                response.raise_for_status()
+    Returns:
+        MD5 hex digest of the downloaded bytes, computed incrementally
+        while streaming so no second pass over the file is needed.
+    """
 
-                for chunk in response.iter_bytes():
-                    download_file.write(chunk)
-        logger.info(f"Completed download of {url}")
+    try:
+        logger.info(f"Downloading {url}")
+        digest = hashlib.md5()
+        # start from a clean file if a previous attempt was retried midway
+        download_file.seek(0)
+        download_file.truncate()
+        # MB-range chunks keep syscall counts low enough that the
+        # download saturates the link rather than the default 4 KiB-ish
+        # buffering.
+        with httpx.stream(
+            "GET", url, timeout=60, follow_redirects=True
+        ) as response:
+            response.raise_for_status()
+
+            for chunk in response.iter_bytes(chunk_size=1 << 20):
+                digest.update(chunk)
+                download_file.write(chunk)
+        logger.info(f"Completed download of {url} (md5={digest.hexdigest()})")
+        return digest.hexdigest()
 
     except Exception as e:
         logger.error(f"Error downloading {url}: {e}")
         raise
 
 
+class _HashingWriter:
+    """Tee writer that updates an MD5 digest with every chunk written."""
+
+    def __init__(self, raw, digest):
+        self._raw = raw
+        self.digest = digest
+
+    def write(self, b) -> int:
+        self.digest.update(b)
+        return self._raw.write(b)
+
+
+class _ResponseStream(io.RawIOBase):
+    """Read-only file-like adapter over an httpx streaming byte iterator."""
+
+    def __init__(self, byte_iterator):
+        self._iter = byte_iterator
+        self._leftover = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        try:
+            chunk = self._leftover or next(self._iter)
+        except StopIteration:
+            return 0
+        n = len(b)
+        output, self._leftover = chunk[:n], chunk[n:]
+        b[: len(output)] = output
+        return len(output)
+
+
+@contextlib.contextmanager
+def _open_input(url: str, use_gzip_input: bool):
+    """Yield a binary stream of parseable XML for the given source URL.
+
+    Plain-XML sources are parsed straight off the HTTP response, so
+    download and parse overlap and nothing is staged to disk. Gzipped
+    sources are still staged to a local temp file because rapidgzip needs
+    a seekable input for parallel decompression.
+    """
+    if use_gzip_input:
+        with open_anonymous_tmp() as downloaded_file:
+            url_download(url, downloaded_file)
+            downloaded_file.seek(0)
+            # rapidgzip decompresses with one thread per core so that zlib
+            # is no longer the pacing term feeding the XML parser.
+            with rapidgzip.open(
+                downloaded_file, parallelization=os.cpu_count()
+            ) as input_file:
+                yield input_file
+    else:
+        with httpx.stream("GET", url, timeout=60) as response:
+            response.raise_for_status()
+            yield io.BufferedReader(
+                _ResponseStream(response.iter_raw(chunk_size=1 << 20)),
+                buffer_size=1 << 20,
+            )
+
+
+def _open_output(output_path: UPath):
+    """Open the destination for writing with upload tuning where it applies.
+
+    Remote (fsspec-backed) paths get a 64 MiB multipart block size so
+    large uploads run as few big parts instead of many small ones; plain
+    local paths don't accept the kwarg and use the default open.
+    """
+    if getattr(output_path, "protocol", ""):
+        return output_path.open("wb", block_size=UPLOAD_BLOCK_SIZE)
+    return output_path.open("wb")
+
+
 def cleanup_old_files(output_dir: Path, entity: str) -> None:
     """Remove old output files for an entity."""
-    for file_path in output_dir.glob(f"*{OUTPUT_SUFFIX}"):
-        file_path.unlink()
-        logger.info(f"Removed old file: {file_path}")
+    for suffix in (OUTPUT_SUFFIX, LEGACY_OUTPUT_SUFFIX):
+        for file_path in output_dir.glob(f"*{suffix}"):
+            file_path.unlink()
+            logger.info(f"Removed old file: {file_path}")
 
 
-def extract_biosample(output_dir: UPath) -> AssetMetadata:
-    """Extract biosample data to NDJSON files."""
+def extract_biosample(output_dir: UPath, use_lxml: bool = True) -> AssetMetadata:
+    """Extract biosample data to NDJSON files.
+
+    Args:
+        output_dir: Base output directory.
+        use_lxml: Use the libxml2-based parser (faster); fall back to the
+            stdlib-based ``BioSampleParser`` if False.
+    """
     return _extract_entity(
         url=BIO_SAMPLE_URL,
         entity="biosample",
         output_dir=output_dir / "biosample" / "raw",
-        parser_class=BioSampleParser,
+        parser_class=LxmlBioSampleParser if use_lxml else BioSampleParser,
         use_gzip_input=True,
     )
 
@@ -80,6 +219,11 @@ def extract_bioproject(output_dir: UPath) -> AssetMetadata:
     )
 
 
+@tenacity.retry(
+    wait=tenacity.wait_exponential(multiplier=1, min=4, max=30),
+    retry=tenacity.retry_if_exception_type(httpx.RequestError),
+    stop=tenacity.stop_after_attempt(5),
+)
 def _extract_entity(
     url: str,
     entity: str,
@@ -87,7 +231,11 @@ def _extract_entity(
     parser_class,
     use_gzip_input: bool,
 ) -> AssetMetadata:
-    """Extract a single entity type to gzipped JSONL (streaming)."""
+    """Extract a single entity type to zstd JSONL (streaming).
+
+    Retried from scratch on network errors since the stream-parsing path
+    cannot resume mid-response.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
     cleanup_old_files(output_dir, entity)
 
@@ -95,62 +243,107 @@ def _extract_entity(
 
     output_files: list[UPath] = []
 
-    with tempfile.NamedTemporaryFile() as downloaded_file:
-        url_download(url, downloaded_file.name)
-
-        obj_counter = 0
-        start_time = time.time()
+    obj_counter = 0
+    start_time = time.time()
 
-        stop_event = threading.Event()
+    stop_event = threading.Event()
 
-        def _log_heartbeat():
-            while not stop_event.wait(HEARTBEAT_INTERVAL):
-                elapsed = time.time() - start_time
-                rps = obj_counter / elapsed if elapsed > 0 else 0.0
-                logger.info(
-                    f"Heartbeat: {entity} parsed {obj_counter} records in {elapsed:.1f}s ({rps:.1f} rec/s)"
-                )
+    def _log_heartbeat():
+        while not stop_event.wait(HEARTBEAT_INTERVAL):
+            elapsed = time.time() - start_time
+            rps = obj_counter / elapsed if elapsed > 0 else 0.0
+            logger.info(
+                f"Heartbeat: {entity} parsed {obj_counter} records in {elapsed:.1f}s ({rps:.1f} rec/s)"
+            )
 
-        # Open input file
-        open_func = gzip.open if use_gzip_input else open
-        mode = "rb"
+    heartbeat_thread = threading.Thread(target=_log_heartbeat, daemon=True)
+    heartbeat_thread.start()
 
-        heartbeat_thread = threading.Thread(target=_log_heartbeat, daemon=True)
-        heartbeat_thread.start()
+    output_path = output_dir / f"data{OUTPUT_SUFFIX}"
 
-        output_path = output_dir / f"data{OUTPUT_SUFFIX}"
+    try:
+        # Write straight to the final destination (local path or remote
+        # UPath) rather than staging to a temp file and copying — that copy
+        # was a second full pass over gigabytes of compressed output. The
+        # hashing tee computes the checksum as compressed bytes stream out.
+        output_digest = hashlib.md5()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            with tempfile.NamedTemporaryFile(
-                mode="wb", delete=False, suffix=OUTPUT_SUFFIX
-            ) as tmp_out:
-                tmp_out_path = Path(tmp_out.name)
-
-            try:
-                with open_func(downloaded_file.name, mode) as input_file, gzip.open(
-                    tmp_out_path, "wb"
-                ) as out_f:
-                    # the parser yields dicts unless validate_with_schema=True
-                    # we skip validation for performance
-                    for obj in parser_class(input_file, validate_with_schema=False):
-                        line = orjson.dumps(obj)
-
-                        out_f.write(line)
-                        out_f.write(b"\n")
-
-                        obj_counter += 1
-
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with tmp_out_path.open("rb") as src, output_path.open("wb") as dst:
-                    shutil.copyfileobj(src, dst)
-
-                output_files.append(output_path)
-                logger.info(f"Wrote {obj_counter} records to {output_path}")
-            finally:
-                tmp_out_path.unlink(missing_ok=True)
-        finally:
-            stop_event.set()
-            heartbeat_thread.join(timeout=1)
+            # zstd at level 3 compresses several times faster than
+            # stdlib gzip at comparable ratios, and threads=-1 spreads
+            # the compression across cores.
+            cctx = zstandard.ZstdCompressor(level=3, threads=-1)
+            with _open_input(url, use_gzip_input) as input_file, _open_output(
+                output_path
+            ) as raw_out, cctx.stream_writer(
+                _HashingWriter(raw_out, output_digest)
+            ) as out_f:
+                # Pipeline: a producer thread parses records while this
+                # thread serializes and gzip-writes them. Decompression
+                # and compression both release the GIL inside zlib, so
+                # the two CPU-bound stages overlap.
+                record_queue: queue.Queue = queue.Queue(maxsize=PARSE_QUEUE_SIZE)
+                producer_error: list[BaseException] = []
+
+                def _parse_records():
+                    try:
+                        # the parser yields dicts unless validate_with_schema=True
+                        # we skip validation for performance
+                        for obj in parser_class(
+                            input_file, validate_with_schema=False
+                        ):
+                            record_queue.put(obj)
+                    except BaseException as e:
+                        producer_error.append(e)
+                    finally:
+                        record_queue.put(_EOF)
+
+                producer = threading.Thread(target=_parse_records, daemon=True)
+                producer.start()
+
+                # Batch serialized records into a single write call to
+                # amortize Python call overhead and zlib dispatch cost
+                # over thousands of records. Bound methods and globals
+                # are hoisted to locals: at tens of millions of records
+                # the attribute lookups alone are measurable.
+                write = out_f.write
+                dumps = orjson.dumps
+                get = record_queue.get
+                newline = b"\n"
+                lines: list[bytes] = []
+                append = lines.append
+                while True:
+                    obj = get()
+                    if obj is _EOF:
+                        break
+                    append(dumps(obj))
+                    obj_counter += 1
+
+                    if len(lines) >= WRITE_BATCH_SIZE:
+                        write(newline.join(lines))
+                        write(newline)
+                        lines.clear()
+
+                if lines:
+                    write(newline.join(lines))
+                    write(newline)
+                    lines.clear()
+
+                producer.join()
+                if producer_error:
+                    raise producer_error[0]
+
+            output_files.append(output_path)
+            logger.info(f"Wrote {obj_counter} records to {output_path}")
+        except BaseException:
+            # Don't leave a partial output behind; the retry (or the next
+            # run) starts from a clean slate.
+            output_path.unlink(missing_ok=True)
+            raise
+    finally:
+        stop_event.set()
+        heartbeat_thread.join(timeout=1)
 
     logger.info(
         f"Completed {entity} extraction: {obj_counter} records, {len(output_files)} files"
@@ -161,7 +354,8 @@ def _extract_entity(
         upstream_assets = [BIO_SAMPLE_URL if entity == "biosample" else BIO_PROJECT_URL],
         row_count = obj_counter,
         format = "jsonl",
-        compression = "gzip",
+        compression = "zstd",
+        checksum = output_digest.hexdigest(),
         created_at = datetime.now(),
         size_bytes = output_path.stat().st_size,
         runtime_seconds = time.time() - start_time,
@@ -171,17 +365,22 @@ def _extract_entity(
 
 
 
-def extract_all(output_dir: UPath) -> dict[str, list[UPath]]:
-    """Extract both biosample and bioproject."""
-    results = {}
-    
-    for entity_func, entity_name in [
-        (extract_bioproject, "bioproject"),
-        (extract_biosample, "biosample"),
-    ]:
-        results[entity_name] = entity_func(output_dir)
+def extract_all(output_dir: UPath) -> dict[str, AssetMetadata]:
+    """Extract both biosample and bioproject concurrently.
 
-    return results
+    The two extractions share no state, and their hot loops spend most of
+    their time in zlib/libxml2 (which release the GIL), so running them on
+    two threads overlaps one entity's download with the other's parse.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            entity_name: executor.submit(entity_func, output_dir)
+            for entity_func, entity_name in [
+                (extract_bioproject, "bioproject"),
+                (extract_biosample, "biosample"),
+            ]
+        }
+        return {name: future.result() for name, future in futures.items()}
 
 
 @click.group()
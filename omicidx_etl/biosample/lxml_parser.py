@@ -0,0 +1,89 @@
+"""lxml-based BioSample XML parser.
+
+A drop-in replacement for ``omicidx.biosample.BioSampleParser`` that drives
+``lxml.etree.iterparse`` (libxml2) instead of the stdlib ``xml.etree``
+parser. Parsing is the compute-bound core of the biosample extraction, and
+libxml2 does the element construction in C, so this cuts per-record parse
+CPU substantially while yielding the same dict records.
+
+Memory stays flat via the standard lxml fast-iter recipe: each ``BioSample``
+element is cleared after conversion and already-processed siblings are
+deleted from the root.
+"""
+from typing import IO, Iterator
+
+from lxml import etree
+
+
+class LxmlBioSampleParser:
+    """Parse a BioSample XML stream with lxml.
+
+    Yields the same dict records as ``omicidx.biosample.BioSampleParser``
+    with ``validate_with_schema=False``.
+    """
+
+    def __init__(self, fh: IO, validate_with_schema: bool = False):
+        """Initialize the parser.
+
+        Args:
+            fh: An open (binary) file-like object of BioSample XML records.
+            validate_with_schema: Accepted for parser_class interface
+                compatibility; validation is not supported (records are
+                plain dicts).
+        """
+        self.fhandle = fh
+        self.context = etree.iterparse(
+            fh, events=("end",), tag="BioSample", huge_tree=True
+        )
+
+    def __iter__(self) -> Iterator[dict]:
+        for _event, elem in self.context:
+            yield self._element_to_dict(elem)
+            # fast-iter cleanup: clear the element and drop processed
+            # siblings so the tree never grows beyond one record
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    @staticmethod
+    def _element_to_dict(elem) -> dict:
+        bios: dict = {"is_reference": None}
+        for k, v in elem.items():
+            bios[k] = v
+        bios["id_recs"] = []
+        bios["ids"] = []
+        bios["sra_sample"] = None
+        bios["dbgap"] = None
+        bios["gsm"] = None
+        for id_elem in elem.iterfind(".//Id"):
+            db = id_elem.get("db")
+            idrec = {
+                "db": db,
+                "label": id_elem.get("db_label"),
+                "id": id_elem.text,
+            }
+            bios["ids"].append(idrec["id"])
+            bios["id_recs"].append(idrec)
+            # xref fields for SRA, dbGaP, and GEO
+            if db == "SRA":
+                bios["sra_sample"] = id_elem.text
+            elif db == "dbGaP":
+                bios["dbgap"] = id_elem.text
+            elif db == "GEO":
+                bios["gsm"] = id_elem.text
+        bios["title"] = elem.findtext(".//Description/Title")
+        bios["description"] = elem.findtext(".//Description/Comment/Paragraph")
+        organism = elem.find(".//Organism")
+        bios["taxonomy_name"] = organism.get("taxonomy_name")
+        bios["taxon_id"] = int(organism.get("taxonomy_id"))
+        bios["attribute_recs"] = []
+        bios["attributes"] = []
+        for attribute in elem.findall(".//Attribute"):
+            attrec = dict(attribute.attrib)
+            attrec["value"] = attribute.text
+            bios["attribute_recs"].append(attrec)
+            bios["attributes"].append(
+                attrec.get("harmonized_name") or attrec.get("attribute_name")
+            )
+        bios["model"] = elem.findtext(".//Model")
+        return bios
@@ -16,17 +16,22 @@ Usage (CLI):
 
 import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import click
 import duckdb
 
-from omicidx_etl.sql import get_sql, list_sql_files
+from omicidx_etl.sql import get_statements, list_sql_files
 from omicidx_etl.log import logger
 
 DB_FILE = "omicidx.duckdb"
 
+# fsspec buffer/part size for the database upload; large parts let s3fs
+# run a multipart upload instead of one serial PUT stream
+UPLOAD_BLOCK_SIZE = 64 << 20
+
 
 def get_view_sql_files() -> list[str]:
     """List SQL files for view definitions (020+), excluding consolidation."""
@@ -35,10 +40,7 @@ def get_view_sql_files() -> list[str]:
 
 def run_sql_file(name: str, con: duckdb.DuckDBPyConnection) -> None:
     """Run a SQL file, executing each statement individually."""
-    import sqlglot
-
-    sql = get_sql(name)
-    statements = sqlglot.transpile(sql, read="duckdb")
+    statements = get_statements(name)
 
     logger.info(f"Running {name} ({len(statements)} statements)")
 
@@ -51,9 +53,13 @@ def run_sql_file(name: str, con: duckdb.DuckDBPyConnection) -> None:
 
 
 def get_table_summaries(con: duckdb.DuckDBPyConnection) -> list[dict]:
-    """Get row counts for all tables and views."""
-    summaries = []
+    """Get row counts for all tables and views.
 
+    Counts over parquet-backed views are latency-bound on remote footer
+    reads, so they run concurrently on cursor clones rather than one
+    round-trip at a time.
+    """
+    targets = []
     for schema in ["main", "geometadb", "sradb"]:
         try:
             tables = con.execute(
@@ -62,16 +68,24 @@ def get_table_summaries(con: duckdb.DuckDBPyConnection) -> list[dict]:
             ).fetchall()
         except Exception:
             continue
+        targets.extend((schema, table) for (table,) in tables)
 
-        for (table,) in tables:
-            qualified = f"{schema}.{table}" if schema != "main" else table
-            try:
-                count = con.execute(f"SELECT COUNT(*) FROM {qualified}").fetchone()[0]
-            except Exception:
-                count = -1
-            summaries.append({"schema": schema, "table": table, "row_count": count})
+    def count_one(target: tuple[str, str]) -> dict:
+        schema, table = target
+        qualified = f"{schema}.{table}" if schema != "main" else table
+        cursor = con.cursor()
+        try:
+            count = cursor.execute(f"SELECT COUNT(*) FROM {qualified}").fetchone()[0]
+        except Exception:
+            count = -1
+        finally:
+            cursor.close()
+        return {"schema": schema, "table": table, "row_count": count}
 
-    return summaries
+    if not targets:
+        return []
+    with ThreadPoolExecutor(max_workers=min(16, len(targets))) as executor:
+        return list(executor.map(count_one, targets))
 
 
 def build(files: list[str] | None = None) -> duckdb.DuckDBPyConnection:
@@ -133,12 +147,14 @@ def upload(con: duckdb.DuckDBPyConnection) -> None:
         f"Uploading {local_path} ({local_path.stat().st_size / 1e6:.1f} MB) "
         f"to {s3_path}..."
     )
-    with local_path.open("rb") as src, s3_path.open("wb") as dst:
-        shutil.copyfileobj(src, dst)
+    with local_path.open("rb") as src, s3_path.open(
+        "wb", block_size=UPLOAD_BLOCK_SIZE
+    ) as dst:
+        shutil.copyfileobj(src, dst, length=8 << 20)
 
     s3_meta_dest = s3_metadata / f"{ts}_metadata.json"
     with metadata_path.open("rb") as src, s3_meta_dest.open("wb") as dst:
-        shutil.copyfileobj(src, dst)
+        shutil.copyfileobj(src, dst, length=8 << 20)
 
     logger.info(f"Uploaded to {s3_path}")
     logger.info(f"Metadata uploaded to {s3_meta_dest}")
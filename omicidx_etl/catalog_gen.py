@@ -0,0 +1,406 @@
+"""Generate a data catalog for the OmicIDX SQL models.
+
+Walks the SQL files in ``omicidx_etl/sql``, extracts the tables/views each
+one creates and depends on (via sqlglot), and — when a built
+``omicidx.duckdb`` is available — collects per-table schema and column
+statistics. The result is a single ``catalog.json`` suitable for
+documentation and lineage tooling.
+
+This lives in the package tree (rather than a standalone script loaded via
+importlib machinery) so the standard importer and bytecode cache apply.
+
+Usage (CLI):
+    uv run oidx catalog
+    uv run oidx catalog --db omicidx.duckdb -o catalog.json
+"""
+
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import click
+import duckdb
+import orjson
+import sqlglot
+from sqlglot import exp
+
+from omicidx_etl.log import get_logger
+from omicidx_etl.sql import SQL_DIR, list_sql_files
+
+logger = get_logger(__name__)
+
+# compiled once; parse_model_file runs these per SQL file
+_FILE_NAME_RE = re.compile(r"^(\d+)_(.*)\.sql$")
+_DESCRIPTION_RE = re.compile(r"^--\s*description:\s*(.+)$", re.MULTILINE)
+_FIRST_COMMENT_RE = re.compile(r"^\s*--(.+)$", re.MULTILINE)
+
+# Schemas surfaced in the built DuckDB database
+CATALOG_SCHEMAS = ["main", "geometadb", "sradb"]
+
+# Table-function-style sources that are not model dependencies; a
+# tuple so str.startswith checks all prefixes in one C call
+SOURCE_FUNCTION_PREFIXES = (
+    "read_parquet",
+    "read_csv",
+    "read_ndjson",
+    "read_json",
+    "information_schema",
+)
+
+# Above this row count, distinct counts switch to DuckDB's
+# HyperLogLog-based approx_count_distinct — exact COUNT(DISTINCT) on
+# multi-million-row tables dominates stats collection for little gain
+APPROX_STATS_ROW_THRESHOLD = 1_000_000
+
+# DuckDB type names treated as numeric for min/max statistics
+NUMERIC_TYPES = frozenset({
+    "TINYINT",
+    "SMALLINT",
+    "INTEGER",
+    "BIGINT",
+    "HUGEINT",
+    "UTINYINT",
+    "USMALLINT",
+    "UINTEGER",
+    "UBIGINT",
+    "UHUGEINT",
+    "FLOAT",
+    "DOUBLE",
+    "DECIMAL",
+})
+
+
+def _is_numeric_type(col_type: str) -> bool:
+    """One set lookup on the type root, e.g. DECIMAL(18,3) -> DECIMAL."""
+    return col_type.split("(", 1)[0].strip() in NUMERIC_TYPES
+
+
+def parse_model_file(path: Path) -> dict:
+    """Parse one SQL model file into a catalog entry.
+
+    Extracts the model name and description from the file header, the
+    objects the file creates, and the upstream objects it reads from.
+    """
+    text = path.read_text()
+
+    name_match = _FILE_NAME_RE.match(path.name)
+    name = name_match.group(2) if name_match else path.stem
+
+    description = None
+    description_match = _DESCRIPTION_RE.search(text)
+    if description_match:
+        description = description_match.group(1).strip()
+    else:
+        # fall back to the first comment line of the file
+        first_comment = _FIRST_COMMENT_RE.match(text)
+        if first_comment:
+            description = first_comment.group(1).strip()
+
+    # parse once; creates and dependencies both walk the same AST
+    statements = sqlglot.parse(text, read="duckdb")
+
+    creates: list[str] = []
+    for statement in statements:
+        if statement is None:
+            continue
+        if isinstance(statement, exp.Create):
+            target = statement.find(exp.Table)
+            if target is not None:
+                creates.append(target.name)
+
+    return {
+        "name": name,
+        "file": path.name,
+        "description": description,
+        # a content hash supports change detection without bloating the
+        # catalog with every model's full SQL text
+        "sql_sha1": hashlib.sha1(text.encode()).hexdigest(),
+        "creates": creates,
+        "dependencies": extract_dependencies(statements),
+    }
+
+
+def extract_dependencies(
+    statements: list[exp.Expression | None],
+) -> tuple[str, ...]:
+    """Return the names of tables/views the parsed statements read from.
+
+    Takes already-parsed sqlglot statements (sharing the parse with
+    ``parse_model_file``). CTE names and table-function sources
+    (read_parquet and friends) are excluded — only real upstream
+    objects count as dependencies. The result is a sorted tuple:
+    deterministic in the catalog output and hashable for callers that
+    want to cache on it.
+    """
+    dependencies: set[str] = set()
+    for statement in statements:
+        if statement is None:
+            continue
+        created = set()
+        for create in statement.find_all(exp.Create):
+            target = create.find(exp.Table)
+            if target is not None:
+                created.add(target.name)
+        # one AST walk per statement, not one per referenced table
+        cte_names = {cte.alias_or_name for cte in statement.find_all(exp.CTE)}
+        for table in statement.find_all(exp.Table):
+            if not table.name:
+                continue
+            if table.name in cte_names:
+                continue
+            if table.name.startswith(SOURCE_FUNCTION_PREFIXES):
+                continue
+            if table.name in created:
+                continue
+            dependencies.add(table.name)
+    return tuple(sorted(dependencies))
+
+
+def build_dependency_graph(models: list[dict]) -> dict[str, list[str]]:
+    """Map each model name to the models that depend on its outputs.
+
+    Built via an inverted created-object -> model index so the graph is
+    one pass over dependencies rather than a models x models scan.
+    """
+    creators: dict[str, list[str]] = {}
+    for model in models:
+        for created in model["creates"]:
+            creators.setdefault(created, []).append(model["name"])
+
+    downstream: dict[str, set[str]] = {model["name"]: set() for model in models}
+    for model in models:
+        for dep in model["dependencies"]:
+            for creator in creators.get(dep, ()):
+                if creator != model["name"]:
+                    downstream[creator].add(model["name"])
+    return {name: sorted(names) for name, names in downstream.items()}
+
+
+def _fetch_column_index(
+    con: duckdb.DuckDBPyConnection,
+) -> dict[tuple[str, str], list[dict]]:
+    """Fetch all catalog-schema columns in one information_schema query.
+
+    One parameterized query replaces a per-table columns lookup; the
+    result is indexed by (schema, table) with columns in ordinal order.
+    """
+    placeholders = ", ".join("?" for _ in CATALOG_SCHEMAS)
+    rows = con.execute(
+        f"SELECT table_schema, table_name, column_name, data_type "
+        f"FROM information_schema.columns "
+        f"WHERE table_schema IN ({placeholders}) "
+        f"ORDER BY table_schema, table_name, ordinal_position",
+        CATALOG_SCHEMAS,
+    ).fetchall()
+    index: dict[tuple[str, str], list[dict]] = {}
+    for schema, table, name, col_type in rows:
+        index.setdefault((schema, table), []).append(
+            {"column": name, "type": col_type}
+        )
+    return index
+
+
+def get_table_stats(
+    con: duckdb.DuckDBPyConnection,
+    schema: str,
+    table: str,
+    columns: list[dict],
+) -> list[dict]:
+    """Collect per-column statistics for one table.
+
+    All aggregates go into one SELECT so DuckDB scans the table once,
+    instead of one COUNT DISTINCT (plus MIN/MAX for numerics) per
+    column. Tables above APPROX_STATS_ROW_THRESHOLD rows use
+    approx_count_distinct and flag the entries with
+    ``distinct_approx``. If the fused query fails, stats fall back to
+    per-column queries so one problematic column cannot sink the whole
+    table.
+    """
+    qualified = f"{schema}.{table}" if schema != "main" else table
+    if not columns:
+        return []
+
+    use_approx = False
+    try:
+        row_count = con.execute(f"SELECT COUNT(*) FROM {qualified}").fetchone()[0]
+        use_approx = row_count > APPROX_STATS_ROW_THRESHOLD
+    except Exception:
+        pass
+
+    select_parts: list[str] = []
+    # (entry, keys-consumed-from-the-result-row) per column
+    layout: list[tuple[dict, list[str]]] = []
+    for col in columns:
+        quoted = '"' + col["column"].replace('"', '""') + '"'
+        keys = ["distinct_count"]
+        if use_approx:
+            select_parts.append(f"approx_count_distinct({quoted})")
+        else:
+            select_parts.append(f"COUNT(DISTINCT {quoted})")
+        if _is_numeric_type(col["type"]):
+            keys += ["min", "max"]
+            select_parts.append(f"MIN({quoted})")
+            select_parts.append(f"MAX({quoted})")
+        layout.append(({"column": col["column"]}, keys))
+
+    try:
+        row = con.execute(
+            f"SELECT {', '.join(select_parts)} FROM {qualified}"
+        ).fetchone()
+    except Exception as e:
+        logger.warning(f"Fused stats query failed for {qualified}: {e}")
+        return _get_table_stats_per_column(con, qualified, columns)
+
+    i = 0
+    stats = []
+    for entry, keys in layout:
+        for key in keys:
+            entry[key] = row[i]
+            i += 1
+        if use_approx:
+            entry["distinct_approx"] = True
+        stats.append(entry)
+    return stats
+
+
+def _get_table_stats_per_column(
+    con: duckdb.DuckDBPyConnection,
+    qualified: str,
+    columns: list[dict],
+) -> list[dict]:
+    """Per-column fallback used when the fused stats query fails."""
+    stats = []
+    for col in columns:
+        entry = {"column": col["column"]}
+        col_name = col["column"]
+        col_type = col["type"]
+        try:
+            entry["distinct_count"] = con.execute(
+                f'SELECT COUNT(DISTINCT "{col_name}") FROM {qualified}'
+            ).fetchone()[0]
+            if _is_numeric_type(col_type):
+                entry["min"], entry["max"] = con.execute(
+                    f'SELECT MIN("{col_name}"), MAX("{col_name}") FROM {qualified}'
+                ).fetchone()
+        except Exception as e:
+            logger.warning(
+                f"Could not collect stats for {qualified}.{col_name}: {e}"
+            )
+        stats.append(entry)
+    return stats
+
+
+def _collect_tables(con: duckdb.DuckDBPyConnection) -> dict[str, list[dict]]:
+    """Collect schema + stats for every table/view in the catalog schemas.
+
+    Tables are independent scans, and DuckDB releases the GIL while
+    executing, so each table's stats queries run on their own cursor
+    clone in a thread pool. Column metadata for all tables comes from
+    a single information_schema query up front.
+    """
+    try:
+        column_index = _fetch_column_index(con)
+    except Exception as e:
+        logger.warning(f"Could not list catalog columns: {e}")
+        return {}
+    targets = list(column_index)
+
+    def collect_one(target: tuple[str, str]) -> tuple[str, list[dict]]:
+        schema, table = target
+        columns = column_index[target]
+        cursor = con.cursor()
+        try:
+            stats = get_table_stats(cursor, schema, table, columns)
+        finally:
+            cursor.close()
+        # merge stats into the column entries in place; no throwaway
+        # merged dict per column, and null stats are simply omitted
+        stats_by_column = {s["column"]: s for s in stats}
+        for col in columns:
+            stat = stats_by_column.get(col["column"])
+            if not stat:
+                continue
+            for key, value in stat.items():
+                if key != "column" and value is not None:
+                    col[key] = value
+        qualified = f"{schema}.{table}" if schema != "main" else table
+        return qualified, columns
+
+    if not targets:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(16, len(targets))) as executor:
+        return dict(executor.map(collect_one, targets))
+
+
+def generate_catalog(
+    output_path: str | Path = "catalog.json",
+    db_path: str | Path | None = None,
+) -> dict:
+    """Generate the catalog and write it as JSON.
+
+    Args:
+        output_path: Where to write catalog.json
+        db_path: Optional path to a built omicidx.duckdb; when given,
+            per-table schema and statistics are included.
+
+    Returns:
+        The catalog dict that was written.
+    """
+    # file reads release the GIL and sqlglot parses are independent per
+    # file, so model files parse on a thread pool; map preserves order
+    names = list_sql_files()
+    logger.info(f"Parsing {len(names)} model files")
+    models: list[dict] = []
+    if names:
+        with ThreadPoolExecutor(
+            max_workers=min(os.cpu_count() or 4, len(names))
+        ) as executor:
+            models = list(
+                executor.map(lambda name: parse_model_file(SQL_DIR / name), names)
+            )
+
+    catalog = {
+        "generated_at": datetime.now(timezone.utc)
+        .isoformat(timespec="seconds")
+        .replace("+00:00", "Z"),
+        "models": models,
+        "dependency_graph": build_dependency_graph(models),
+    }
+
+    if db_path is not None and Path(db_path).exists():
+        con = duckdb.connect(str(db_path), read_only=True)
+        try:
+            catalog["tables"] = _collect_tables(con)
+        finally:
+            con.close()
+
+    # orjson encodes in C and emits bytes directly, so no intermediate
+    # Python string of the whole catalog is ever built
+    Path(output_path).write_bytes(
+        orjson.dumps(catalog, option=orjson.OPT_INDENT_2, default=str)
+    )
+    logger.info(f"Wrote catalog with {len(models)} models to {output_path}")
+
+    return catalog
+
+
+@click.command("catalog")
+@click.option(
+    "-o",
+    "--output",
+    default="catalog.json",
+    show_default=True,
+    help="Output path for the catalog JSON",
+)
+@click.option(
+    "--db",
+    "db_path",
+    default=None,
+    help="Path to a built omicidx.duckdb for table schema/statistics",
+)
+def catalog(output: str, db_path: str | None):
+    """Generate catalog.json for the SQL models."""
+    generate_catalog(output, db_path)
@@ -1,41 +1,69 @@
 """
 Main CLI entry point for omicidx-etl.
+
+Subcommands are loaded lazily: each one pulls in heavy dependencies
+(polars, duckdb, pyarrow, httpx, ...), so importing all of them up front
+costs seconds of cold-start for every invocation. The LazyGroup imports a
+subcommand's module only when that subcommand is dispatched.
 """
 
+import importlib
+
 import click
 from dotenv import load_dotenv
 
 # Load .env file early to ensure AWS credentials are available
 load_dotenv()
 
-from omicidx_etl.biosample.extract import biosample
-from omicidx_etl.etl.europepmc_textmined import europepmc
-from omicidx_etl.etl.icite import icite
-from omicidx_etl.etl.pubmed import pubmed
-from omicidx_etl.geo.extract import geo
-from omicidx_etl.nih_reporter import nih_reporter
-from omicidx_etl.sra.cli import sra
-from omicidx_etl.sql.runner import sql
-from omicidx_etl.build_db import build_db
 
+class LazyGroup(click.Group):
+    """A click Group that imports subcommands on first use.
+
+    ``lazy_subcommands`` maps command name to an ``module:attribute``
+    import path for the click command object.
+    """
+
+    def __init__(self, *args, lazy_subcommands: dict[str, str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(super().list_commands(ctx) + list(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._lazy_load(cmd_name)
+        return super().get_command(ctx, cmd_name)
 
-@click.group()
+    def _lazy_load(self, cmd_name: str) -> click.Command:
+        import_path = self.lazy_subcommands[cmd_name]
+        module_name, attr_name = import_path.split(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, attr_name)
+
+
+LAZY_SUBCOMMANDS = {
+    "biosample": "omicidx_etl.biosample.extract:biosample",
+    "ebi-biosample": "omicidx_etl.ebi_biosample.extract:ebi_biosample",
+    "europepmc": "omicidx_etl.etl.europepmc_textmined:europepmc",
+    "icite": "omicidx_etl.etl.icite:icite",
+    "pubmed": "omicidx_etl.etl.pubmed:pubmed",
+    "geo": "omicidx_etl.geo.extract:geo",
+    "nih-reporter": "omicidx_etl.nih_reporter:nih_reporter",
+    "scimago": "omicidx_etl.etl.scimago:scimago",
+    "sra": "omicidx_etl.sra.cli:sra",
+    "sql": "omicidx_etl.sql.runner:sql",
+    "build-db": "omicidx_etl.build_db:build_db",
+    "catalog": "omicidx_etl.catalog_gen:catalog",
+}
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=LAZY_SUBCOMMANDS)
 @click.version_option()
 def cli():
     """OmicIDX ETL Pipeline - Simplified data extraction tools."""
     pass
 
 
-# Add subcommands
-cli.add_command(biosample)
-cli.add_command(europepmc)
-cli.add_command(icite)
-cli.add_command(pubmed)
-cli.add_command(geo)
-cli.add_command(nih_reporter)
-cli.add_command(sra)
-cli.add_command(sql)
-cli.add_command(build_db)
-
 if __name__ == "__main__":
     cli()
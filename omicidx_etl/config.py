@@ -1,5 +1,7 @@
 """config settings for omicidx_etl"""
 
+from functools import cached_property
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 from dotenv import load_dotenv
@@ -24,8 +26,11 @@ class Settings(BaseSettings):
     AWS_USE_SSL: Optional[bool] = True
     AWS_REGION: Optional[str] = None
 
-    @property
+    @cached_property
     def publish_directory(self) -> UPath:
+        # UPath construction resolves the filesystem implementation for
+        # the URL scheme; callers treat this as a cheap attribute, so
+        # compute it once rather than per access
         return UPath(self.PUBLISH_DIRECTORY)
 
 settings = Settings()  # type: ignore
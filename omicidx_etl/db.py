@@ -1,21 +1,54 @@
 from .config import settings
 import duckdb
 import contextlib
+import os
+import shutil
 from pathlib import Path
 from typing import Optional
 import tempfile
 
+GB = 1 << 30
+
+
+def _host_resource_limits(temp_directory: str) -> tuple[int, int]:
+    """Pick DuckDB memory and temp-spill limits from what the host has.
+
+    Hardcoded limits either starve big hosts (forcing spills that the RAM
+    could have absorbed) or overcommit small ones, so size them at runtime:
+    75% of currently-available RAM and 80% of free disk under the temp
+    directory (capped at 500 GB).
+    """
+    try:
+        available_ram = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        available_ram = 16 * GB
+
+    # the temp directory may not exist yet; measure the nearest ancestor
+    probe = Path(temp_directory)
+    while not probe.exists():
+        probe = probe.parent
+    free_disk = shutil.disk_usage(probe).free
+
+    memory_limit = max(4 * GB, int(available_ram * 0.75))
+    temp_limit = min(int(free_disk * 0.8), 500 * GB)
+    return memory_limit, temp_limit
+
 
 def duckdb_setup_sql(temp_directory: Optional[str] = None):
     """
     Generate DuckDB setup SQL with optional custom temp directory.
 
+    Memory, temp-directory, and thread settings are sized from the host
+    rather than hardcoded — see `_host_resource_limits`.
+
     Args:
         temp_directory: Custom temp directory path. If None, uses /tmp/db_temp
     """
     if temp_directory is None:
         temp_directory = '/tmp/db_temp'
 
+    memory_limit, temp_limit = _host_resource_limits(temp_directory)
+
     endpoint = 's3.amazonaws.com'
     if settings.AWS_ENDPOINT_URL is not None:
         endpoint = settings.AWS_ENDPOINT_URL.replace('https://', '').replace('http://', '')
@@ -23,10 +56,12 @@ def duckdb_setup_sql(temp_directory: Optional[str] = None):
     return f"""
     INSTALL httpfs;
     LOAD httpfs;
-    SET memory_limit='16GB';
+    SET memory_limit='{memory_limit // (1 << 20)}MB';
+    SET threads TO {os.cpu_count()};
+    SET enable_object_cache=true;
     SET preserve_insertion_order=false;
     SET temp_directory='{temp_directory}';
-    SET max_temp_directory_size='100GB';
+    SET max_temp_directory_size='{temp_limit // GB}GB';
     CREATE SECRET minio (
         TYPE S3,
         KEY_ID '{settings.AWS_ACCESS_KEY_ID}',
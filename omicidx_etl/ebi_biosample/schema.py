@@ -1,13 +1,17 @@
 """Schema definitions for EBI BioSample records."""
 
+import functools
+
 import pyarrow as pa
 
 
+@functools.cache
 def get_biosample_schema() -> pa.Schema:
     """Get the PyArrow schema for EBI BioSample records.
 
     Returns a schema that matches the structure of EBI BioSample API responses
-    with flattened characteristics.
+    with flattened characteristics. The schema is immutable, so it is
+    built once and shared across all day-tasks.
     """
     return pa.schema([
         pa.field("accession", pa.string()),
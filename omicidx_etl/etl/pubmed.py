@@ -1,7 +1,12 @@
 import re
 import datetime
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import click
+import httpx
 import pubmed_parser as pp
+from lxml import etree
+from urllib.parse import urljoin
 from urllib.request import urlretrieve
 import tempfile
 import shutil
@@ -15,59 +20,138 @@ logger = get_logger(__name__)
 
 
 # Module-level constants
-PUBMED_BASE = UPath("https://ftp.ncbi.nlm.nih.gov/pubmed")
+PUBMED_LISTING_URLS = (
+    "https://ftp.ncbi.nlm.nih.gov/pubmed/baseline/",
+    "https://ftp.ncbi.nlm.nih.gov/pubmed/updatefiles/",
+)
 OUTPUT_EXTENSION = ".parquet"
 
+# Records per parquet row group / write batch
+PARQUET_BATCH_SIZE = 10_000
 
-def _url_to_pubmed_id(url: UPath) -> str:
+
+def _url_to_pubmed_id(url: str) -> str:
     """Get the pubmed id from the url.
-    
+
     For example, for a URL like `https://ftp.ncbi.nlm.nih.gov/pubmed/pubmed25n0023.xml.gz`
     it will return `pubmed25n0023`.
     """
-    return re.sub(r"\..*", "", url.name)
+    return re.sub(r"\..*", "", url.rsplit("/", 1)[-1])
+
+
+def _as_upath(url) -> UPath:
+    """Wrap a raw URL string as a UPath at the point of use.
+
+    The listing maps hold plain strings — UPath construction walks the
+    protocol registry and is too expensive to pay per listed file — so
+    paths are wrapped only for the handful of files actually opened.
+    """
+    return url if isinstance(url, UPath) else UPath(url)
 
 
+def _iter_listing_hrefs(listing_url: str):
+    """Stream one NCBI directory listing, yielding pubmed .xml.gz URLs.
+
+    The page is fed chunk-by-chunk into lxml's C HTML pull parser as
+    the response arrives, so the multi-MB listing is never buffered as
+    one string and no Python-level regex scan runs over it."""
+    parser = etree.HTMLPullParser(events=("end",), tag="a")
+    with httpx.stream(
+        "GET", listing_url, timeout=30, follow_redirects=True
+    ) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                href = element.get("href")
+                if href and href.startswith("pubmed") and href.endswith(".xml.gz"):
+                    yield urljoin(listing_url, href)
+                element.clear()
+
+
+@functools.lru_cache(maxsize=1)
 def load_available_urls():
     """Load the available urls from the base directory.
-    
-    Note that this function covers both the base and update URLs."""
-    available_urls = list(PUBMED_BASE.glob("baseline/pubmed*.xml.gz"))
-    available_urls += list(PUBMED_BASE.glob("updatefiles/pubmed*.xml.gz"))
-    id_to_available_url_map = {
-        _url_to_pubmed_id(url): url for url in available_urls
-    }
+
+    Note that this function covers both the base and update URLs.
+
+    The NCBI listing is two HTTP directory pages, so the result is
+    memoized for the life of the process (use ``cache_clear()`` to
+    force a re-listing)."""
+    id_to_available_url_map = {}
+    for listing_url in PUBMED_LISTING_URLS:
+        for url in _iter_listing_hrefs(listing_url):
+            id_to_available_url_map[_url_to_pubmed_id(url)] = url
     return id_to_available_url_map
 
 
+@functools.lru_cache(maxsize=8)
 def load_existing_urls(output_path: UPath):
-    """Load the existing urls from the output directory."""
-    existing_urls = list(output_path.glob(f"**/*{OUTPUT_EXTENSION}"))
-    id_to_existing_url_map = {
-        _url_to_pubmed_id(url): url for url in existing_urls
+    """Load the existing urls from the output directory.
+
+    Memoized per output path, and listed at the filesystem level: one
+    top-level ls, then one recursive find per subdirectory, issued in
+    parallel. Remote listings are latency-bound, so concurrent
+    prefixes multiply throughput; a flat directory costs a single ls."""
+    fs = output_path.fs
+    try:
+        entries = fs.ls(output_path.path, detail=True)
+    except FileNotFoundError:
+        return {}
+    files = [e["name"] for e in entries if e.get("type") == "file"]
+    subdirs = [e["name"] for e in entries if e.get("type") == "directory"]
+    if subdirs:
+        with ThreadPoolExecutor(max_workers=min(16, len(subdirs))) as executor:
+            for found in executor.map(fs.find, subdirs):
+                files.extend(found)
+    return {
+        _url_to_pubmed_id(url): url
+        for url in (
+            fs.unstrip_protocol(path)
+            for path in files
+            if path.endswith(OUTPUT_EXTENSION)
+        )
     }
-    return id_to_existing_url_map
 
 
 def get_needed_ids(output_path: UPath, replace=False):
     """Return the ids that are needed to be processed."""
     available_urls = load_available_urls()
+    if replace:
+        # everything is needed; don't bother listing the output
+        return set(available_urls)
+    if not available_urls:
+        return set()
+
     existing_urls = load_existing_urls(output_path)
-    
-    in_ids = set(available_urls.keys())
-    out_ids = set(existing_urls.keys())
+    if not existing_urls:
+        # first run: nothing to subtract
+        return set(available_urls)
+
+    # dict-keys views subtract directly into a set, without first
+    # materializing each side as its own set
+    return available_urls.keys() - existing_urls.keys()
 
-    if replace:
-        return in_ids
 
-    return in_ids - out_ids
+def has_needed_ids(output_path: UPath, replace=False) -> bool:
+    """Return True if any PubMed file still needs processing.
+
+    Short-circuits on the first missing id instead of building the
+    full difference, so "is there work?" guards stay O(1) in the
+    common already-up-to-date case."""
+    if replace:
+        return bool(load_available_urls())
+    existing_urls = load_existing_urls(output_path)
+    if not existing_urls:
+        return bool(load_available_urls())
+    return any(id not in existing_urls for id in load_available_urls())
 
 
 def get_needed_urls(output_path: UPath, replace=False) -> list[UPath]:
     """Return the urls that are needed to be processed."""
     available_urls = load_available_urls()
     needed_ids = get_needed_ids(output_path, replace=replace)
-    return [available_urls[id] for id in needed_ids]
+    return [_as_upath(available_urls[id]) for id in needed_ids]
 
 
 def parquet_file_for_url(url: UPath, output_path: UPath) -> UPath:
@@ -98,23 +182,55 @@ def pubmed_url_to_parquet_file(url: UPath, output_path: UPath) -> None:
             reference_list=True,
             parse_downto_mesh_subterms=True,
         )
-        objects = []
+        # Stream articles into a persistent ParquetWriter in batches
+        # rather than materializing the whole file as one pylist table.
+        # The schema is frozen from the first batch (pubmed_parser yields
+        # a fixed set of keys per article), so later batches skip schema
+        # inference entirely.
+        writer: pq.ParquetWriter | None = None
+        batch: list[dict] = []
+
+        def _write_batch() -> None:
+            nonlocal writer
+            if not batch:
+                return
+            if writer is None:
+                table = pa.Table.from_pylist(batch)
+                writer = pq.ParquetWriter(
+                    local_parquet_file.name, table.schema, compression="zstd"
+                )
+            else:
+                table = pa.Table.from_pylist(batch, schema=writer.schema)
+            writer.write_table(table)
+            batch.clear()
+
         for obj in pubmed_article_generator:
             obj["_inserted_at"] = datetime.datetime.now()
             obj["_read_from"] = str(url)
-            objects.append(obj)
-        pubmed_table = pa.Table.from_pylist(objects)
-        # write the table to parquet locally first
-        # then upload it to the final destination
-        pq.write_table(pubmed_table, local_parquet_file.name, compression='zstd')
+            batch.append(obj)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                _write_batch()
+
+        _write_batch()
+        if writer is None:
+            # No articles at all — still emit a valid (empty) parquet file
+            writer = pq.ParquetWriter(
+                local_parquet_file.name, pa.schema([]), compression="zstd"
+            )
+        writer.close()
         with parquet_file_for_url(url, output_path).open("wb") as outfile:
             logger.info(f"Writing {url} to {str(outfile)}")
             with open(local_parquet_file.name, 'rb') as infile:
-                shutil.copyfileobj(infile, outfile)
+                shutil.copyfileobj(infile, outfile, length=8 << 20)
             logger.info(f"Finished writing {url} to {str(outfile)}")
 
 
 def etl_pubmeds(output_path: UPath, replace: bool = False):
+    # cheap guard first; the listings behind it are memoized, so the
+    # full diff below reuses them when there is work to do
+    if not has_needed_ids(output_path, replace=replace):
+        logger.info("No PubMed files need processing")
+        return
     needed_urls = get_needed_urls(output_path, replace=replace)
     logger.info(f"Processing {len(needed_urls)} urls")
     output_path.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,83 @@
+import re
+import shutil
+import tempfile
+
+import click
+import httpx
+import polars as pl
+from upath import UPath
+
+from omicidx_etl.log import get_logger
+
+logger = get_logger(__name__)
+
+SCIMAGO_URL = "https://www.scimagojr.com/journalrank.php?out=xls"
+
+# compiled once at import; the per-call re.sub path recompiles (or at
+# least re-hashes into the regex cache) for every column
+_COL_RE = re.compile(r"[^\w\d_]+")
+
+
+def _clean_column(col: str) -> str:
+    """Normalize a raw CSV header to a snake_case identifier."""
+    return _COL_RE.sub("_", col.lower()).strip("_")
+
+
+def fetch_and_save_scimago(output_file: UPath) -> None:
+    """Fetch the Scimago journal rankings and write them as Parquet.
+
+    The CSV is downloaded once to a temp file (``scan_csv`` needs a
+    local, seekable path) and then streamed through the lazy
+    scan -> sink pipeline, so peak memory is one row group rather than
+    the whole table. ``maintain_order=False`` lets the sink write row
+    groups as they finish instead of serializing on input order.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".csv") as tmp:
+        with httpx.stream(
+            "GET", SCIMAGO_URL, timeout=60, follow_redirects=True
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                tmp.write(chunk)
+        tmp.flush()
+
+        lf = pl.scan_csv(tmp.name, separator=";")
+        # aliasing inside the lazy plan fuses the rename with the
+        # streaming sink instead of running a Python loop per column on
+        # materialized data
+        lf = lf.select(
+            pl.col(col).alias(_clean_column(col))
+            for col in lf.collect_schema().names()
+        )
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as out_tmp:
+            lf.sink_parquet(
+                out_tmp.name,
+                compression="zstd",
+                row_group_size=100_000,
+                maintain_order=False,
+            )
+            with open(out_tmp.name, "rb") as src, output_file.open("wb") as dst:
+                shutil.copyfileobj(src, dst, length=8 << 20)
+    logger.info(f"Wrote {output_file}")
+
+
+@click.group()
+def scimago():
+    """Scimago journal rank extraction commands."""
+    pass
+
+
+@scimago.command()
+@click.argument("output_base", required=False, default=None)
+def extract(output_base: str | None):
+    """Extract Scimago journal rankings to Parquet."""
+    from omicidx_etl.config import settings
+
+    base = UPath(output_base) if output_base else settings.publish_directory
+    output_path = base / "scimago" / "raw"
+    output_path.mkdir(parents=True, exist_ok=True)
+    fetch_and_save_scimago(output_path / "scimago.parquet")
+
+
+if __name__ == "__main__":
+    extract()
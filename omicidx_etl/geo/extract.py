@@ -1,4 +1,6 @@
 import anyio
+import functools
+import io
 import re
 import faulthandler
 from upath import UPath
@@ -11,6 +13,7 @@ import polars as pl
 import gzip
 
 import httpx
+import orjson
 from anyio import create_memory_object_stream
 from anyio.streams.memory import MemoryObjectSendStream, MemoryObjectReceiveStream
 from omicidx.geo import parser as gp
@@ -26,7 +29,11 @@ import tempfile
 import shutil
 
 
-faulthandler.enable()
+try:
+    faulthandler.enable()
+except (io.UnsupportedOperation, AttributeError, ValueError):
+    # stderr has no real file descriptor (e.g. under click's CliRunner)
+    pass
 
 
 @retry(
@@ -76,12 +83,16 @@ async def fetch_geo_soft_worker(
                 await entity_text_to_process_send.send(geo_text)
 
 
+@functools.lru_cache(maxsize=1024)
 def get_result_paths(start_date, end_date, output_path: UPath):
     """Get the output upaths for the given month.
 
     Assumes hive-like partitioning by year and month.
     Confirmed that duckdb can read from this structure.
 
+    Pure path formatting, so results are memoized: the skip guard and
+    the writer both resolve the same month's paths during a run.
+
     Args:
         start_date: Start date of the month
         end_date: End date of the month
@@ -119,10 +130,13 @@ async def write_geo_entity_worker(
         # Note that we don't use parquet because the schema
         # vary by file. We just write ndjson files.
         # The files can be converted in bulk to parquet by duckdb later
+        # level 3 deflates JSONL several times faster than the default 9
+        # for a few percent more bytes; these files are re-read once by
+        # DuckDB and then discarded, so encode speed wins.
         with (
-            gzip.open(gse_temp.name, "wb") as gse_tmp_write,
-            gzip.open(gsm_temp.name, "wb") as gsm_tmp_write,
-            gzip.open(gpl_temp.name, "wb") as gpl_tmp_write
+            gzip.open(gse_temp.name, "wb", compresslevel=3) as gse_tmp_write,
+            gzip.open(gsm_temp.name, "wb", compresslevel=3) as gsm_tmp_write,
+            gzip.open(gpl_temp.name, "wb", compresslevel=3) as gpl_tmp_write
         ):
             async with entity_text_to_process_receive:
                 async for text in entity_text_to_process_receive:
@@ -130,18 +144,20 @@ async def write_geo_entity_worker(
                     entity = gp._parse_single_entity_soft(lines)
                     if entity is None:
                         continue
+                    # orjson is several times faster than pydantic's own
+                    # JSON path for these record dicts
+                    line = (
+                        orjson.dumps(
+                            entity.model_dump(), option=orjson.OPT_NON_STR_KEYS
+                        )
+                        + b"\n"
+                    )
                     if entity.accession.startswith("GSE"):  # type: ignore
-                        gse_tmp_write.write(
-                            entity.model_dump_json().encode("utf-8") + b"\n"
-                        )  # type: ignore
+                        gse_tmp_write.write(line)
                     elif entity.accession.startswith("GSM"):  # type: ignore
-                        gsm_tmp_write.write(
-                            entity.model_dump_json().encode("utf-8") + b"\n"
-                        )  # type: ignore
+                        gsm_tmp_write.write(line)
                     elif entity.accession.startswith("GPL"):  # type: ignore
-                        gpl_tmp_write.write(
-                            entity.model_dump_json().encode("utf-8") + b"\n"
-                        )  # type: ignore
+                        gpl_tmp_write.write(line)
                     record_counts[entity.accession[:3]] += 1  # type: ignore
 
 
@@ -157,7 +173,7 @@ async def write_geo_entity_worker(
             path.parent.mkdir(parents=True, exist_ok=True)
             with open(temp_file.name, "rb") as src:
                 with path.open("wb") as dst:
-                    shutil.copyfileobj(src, dst)
+                    shutil.copyfileobj(src, dst, length=8 << 20)
             n = record_counts[entity_type]
             if n > 0:
                 logger.info(f"Wrote {n} {entity_type} records to {path}")
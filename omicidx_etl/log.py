@@ -18,14 +18,20 @@ Usage:
     with log_duration(log, "Downloaded XML"):
         download_file(url)
 """
+import functools
 import os
 import sys
+import threading
 import time
 from contextlib import contextmanager
 from typing import Optional
 
 from loguru import logger
 
+# Set once configure_logging has run, so lazy init never clobbers an
+# explicit configuration done at application startup.
+_configured = False
+
 
 def is_ci_environment() -> bool:
     """Detect if running in CI (GitHub Actions, GitLab CI, etc.)."""
@@ -52,6 +58,8 @@ def configure_logging(
         level: Minimum log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         diagnose: If True, include variables in exception traces
     """
+    global _configured
+    _configured = True
     logger.remove()  # Remove default handler
     
     # Auto-detect JSON logging preference
@@ -93,6 +101,17 @@ def configure_logging(
     )
 
 
+@functools.cache
+def _ensure_configured() -> None:
+    """Apply the default logging configuration exactly once.
+
+    The cache makes repeat calls a dict lookup, so get_logger stays
+    cheap on hot paths; an explicit configure_logging() beforehand wins.
+    """
+    if not _configured:
+        configure_logging()
+
+
 def get_logger(name: str, **extra_context):
     """
     Get a logger bound with context.
@@ -108,6 +127,7 @@ def get_logger(name: str, **extra_context):
         log = get_logger(__name__, entity="study", date="2025-12-06")
         log.info("Processing entry", url="https://...")
     """
+    _ensure_configured()
     return logger.bind(name=name, **extra_context)
 
 
@@ -220,30 +240,41 @@ class LogProgress:
         self.log_every = log_every
         self.extra_context = extra_context
         self.count = 0
+        # countdown to the next emit: a decrement + compare per update
+        # instead of a modulo, which matters in tight record loops
+        self._remaining = log_every
+        # updates may arrive from worker threads (e.g. catalog pools)
+        self._lock = threading.Lock()
         self.start_time = time.time()
-    
+
     def update(self, n: int = 1):
         """
         Update progress by n items.
-        
+
         Args:
             n: Number of items processed (default 1)
         """
-        self.count += n
-        if self.count % self.log_every == 0 or self.count == self.total:
-            elapsed = time.time() - self.start_time
-            rate = self.count / elapsed if elapsed > 0 else 0
-            pct = (self.count / self.total * 100) if self.total > 0 else 0
-            
-            self.log.info(
-                f"Progress: {self.operation}",
-                processed=self.count,
-                total=self.total,
-                percent=round(pct, 1),
-                rate_per_sec=round(rate, 1),
-                elapsed_seconds=round(elapsed, 1),
-                **self.extra_context,
-            )
+        with self._lock:
+            self.count += n
+            self._remaining -= n
+            if self._remaining > 0 and self.count != self.total:
+                return
+            self._remaining = self.log_every
+            count = self.count
+
+        elapsed = time.time() - self.start_time
+        rate = count / elapsed if elapsed > 0 else 0
+        pct = (count / self.total * 100) if self.total > 0 else 0
+
+        self.log.info(
+            f"Progress: {self.operation}",
+            processed=count,
+            total=self.total,
+            percent=round(pct, 1),
+            rate_per_sec=round(rate, 1),
+            elapsed_seconds=round(elapsed, 1),
+            **self.extra_context,
+        )
     
     def complete(self):
         """Mark operation as complete and log final stats."""
@@ -257,8 +288,3 @@ class LogProgress:
             avg_rate_per_sec=round(rate, 1),
             **self.extra_context,
         )
-
-
-# Initialize with defaults on import
-# Users can call configure_logging() explicitly to override
-configure_logging()
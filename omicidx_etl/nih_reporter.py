@@ -168,8 +168,8 @@ def csv_to_jsonl(csv_file: pathlib.Path, output_file: pathlib.Path) -> None:
         
         # Compress the JSONL file
         with open(temp_jsonl, 'rb') as f_in:
-            with gzip.open(output_file, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
+            with gzip.open(output_file, 'wb', compresslevel=3) as f_out:
+                shutil.copyfileobj(f_in, f_out, length=8 << 20)
         
         # Remove temporary file
         temp_jsonl.unlink()
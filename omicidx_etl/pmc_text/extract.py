@@ -2,6 +2,12 @@ import aioboto3
 from botocore import UNSIGNED
 from botocore.config import Config
 from datetime import datetime
+import glob
+import os
+import tempfile
+import time
+import duckdb
+import pyarrow as pa
 import pyarrow.parquet as pq
 import polars as pl
 import asyncio
@@ -11,10 +17,32 @@ from tqdm.asyncio import tqdm
 SESSION = aioboto3.Session()
 
 MAX_CONCURRENT_FETCHES = 50
+# parquet writers running in parallel; zstd compression is the CPU-bound
+# part of the pipeline, and sharding rows across writers by key lets
+# several compression streams proceed at once
+NUM_WRITERS = 4
 ROWS_PER_PARQUET = 5000
+# rows per Arrow record batch; keeps the per-column accumulation lists
+# roughly L2-cache sized before they become immutable Arrow arrays
+BATCH_ROWS = 8192
 obj_count = 0
- 
+
+PMC_TEXT_SCHEMA = pa.schema([
+    ("bucket", pa.string()),
+    ("key", pa.string()),
+    ("etag", pa.string()),
+    ("last_modified", pa.string()),
+    ("content_length", pa.int64()),
+    # raw response bytes; the payloads are UTF-8 text but decoding them
+    # here would only re-encode on write — consumers decode on demand
+    ("text", pa.large_binary()),
+    ("fetched_at", pa.timestamp("us")),
+])
+
 async def fetch_object(httpx_client: httpx.AsyncClient, bucket, key):
+    """Fetch one object; returns a tuple in PMC_TEXT_SCHEMA field order
+    (minus fetched_at) — tuples skip the per-row dict allocation and
+    hashing that millions of small objects would otherwise pay."""
     try:
         resp = await httpx_client.get(
             f"https://{bucket}.s3.amazonaws.com/{key}",
@@ -23,162 +51,257 @@ async def fetch_object(httpx_client: httpx.AsyncClient, bucket, key):
         resp.raise_for_status()
         headers = resp.headers
         body = resp.content
-        return {
-            "bucket": bucket,
-            "key": key,
-            "etag": headers.get("ETag", ""),
-            "last_modified": headers.get("LastModified", ""),
-            "content_length": len(body),
-            "text": body.decode("utf-8", errors="replace")
-        }
+        return (
+            bucket,
+            key,
+            headers.get("ETag", ""),
+            headers.get("LastModified", ""),
+            len(body),
+            body,
+        )
     except Exception as e:
         print(f"ERROR fetching s3://{bucket}/{key}: {e}")
         raise
     
-async def fetch_worker(queue, writer_queue, semaphore, httpx_client, pbar):
+async def fetch_worker(queue, writer_queues, httpx_client, pbar):
     byte_count = 0
     while True:
-        try:
-            item = await queue.get()
-            if item is None:
-                queue.task_done()
-                break
-
-            async with semaphore:
-                try:
-                    row = await fetch_object(httpx_client, item["bucket"], item["key"])
-                    row['fetched_at'] = datetime.now()
-                    byte_count += row['content_length']
-                    await writer_queue.put(row)
-                    pbar.update(1)
-                except Exception as e:
-                    print(f"Worker failed to fetch: {e}")
-                    pbar.update(1)
+        item = await queue.get()
+        if item is None:
             queue.task_done()
+            break
+
+        # concurrency is bounded by worker count and the client's
+        # connection pool; task_done runs exactly once per item so
+        # queue.join() cannot under- or over-count on error paths
+        try:
+            fetched = await fetch_object(httpx_client, item["bucket"], item["key"])
+            byte_count += fetched[4]  # content_length
+            # shard by key so each writer sees a stable subset
+            await writer_queues[hash(fetched[1]) % NUM_WRITERS].put(fetched)
         except Exception as e:
-            print(f"Worker exception: {e}")
+            print(f"Worker failed to fetch: {e}")
+        finally:
+            pbar.update(1)
             queue.task_done()
         
-async def write_worker(queue, rows):
+async def write_worker(queue, writer_id: int = 0):
+    """Stream fetched rows into a long-lived Parquet writer.
+
+    Rows arrive as tuples and are appended straight into per-column
+    lists, which become immutable Arrow record batches every BATCH_ROWS
+    rows. Each batch goes straight to an open ParquetWriter, so peak
+    memory is one batch rather than the old 1 GB row buffer, and write
+    cost is amortized across the fetch stream instead of stalling it at
+    flush points. Files rotate once ~1 GB of text has been written.
+    """
     byte_count = 0
+    # fetched_at is stamped per batch, not per row, so rows carry one
+    # column fewer than the schema
+    columns: list[list] = [[] for _ in range(len(PMC_TEXT_SCHEMA) - 1)]
+    writer: pq.ParquetWriter | None = None
+    current_file = ""
+
+    async def write_batch():
+        nonlocal writer, current_file
+        # one datetime per batch instead of one allocation per row; a
+        # batch spans well under a second of fetching
+        fetched_at = datetime.now()
+        n_rows = len(columns[0])
+        arrays = [
+            pa.array(col, type=field.type)
+            for col, field in zip(columns, PMC_TEXT_SCHEMA)
+        ]
+        arrays.append(pa.array([fetched_at] * n_rows, type=pa.timestamp("us")))
+        batch = pa.record_batch(arrays, schema=PMC_TEXT_SCHEMA)
+        for col in columns:
+            col.clear()
+        if writer is None:
+            # writer id + nanosecond timestamp keep filenames unique
+            # across concurrent writers and rotations
+            current_file = f"pmc_text_{writer_id}_{time.time_ns()}.parquet"
+            writer = pq.ParquetWriter(
+                current_file,
+                PMC_TEXT_SCHEMA,
+                compression="zstd",
+                compression_level=3,
+                use_dictionary=True,
+                write_statistics=False,
+            )
+        # zstd compression is the expensive part; run it on a thread so
+        # fetch workers keep the event loop while this writer compresses
+        await asyncio.to_thread(writer.write_batch, batch)
+
+    async def rotate():
+        nonlocal writer
+        if columns[0]:
+            await write_batch()
+        if writer is not None:
+            writer.close()
+            writer = None
+            print(f"Wrote {current_file}")
+
     while True:
         item = await queue.get()
         if item is None:
-            # Flush any remaining rows before exiting
-            if rows:
-                print(f"Flushing {len(rows)} rows to parquet")
-                table = pl.DataFrame(rows)
-                timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
-                filename = f"pmc_text_{timestamp}.parquet"
-                pq.write_table(table.to_arrow(), filename)
-                print(f"Wrote {filename}")
-                rows.clear()
+            # Close out the current file before exiting
+            await rotate()
             queue.task_done()
             break
 
-        rows.append(item)
-        byte_count += item['content_length']
+        # Drain whatever the fetch workers have queued up behind the
+        # first row, so one await wakes the writer once per burst rather
+        # than once per row.
+        drained = [item]
+        sentinel = False
+        while len(drained) < BATCH_ROWS:
+            try:
+                nxt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if nxt is None:
+                sentinel = True
+                break
+            drained.append(nxt)
+
+        for row in drained:
+            for col, value in zip(columns, row):
+                col.append(value)
+            byte_count += row[4]  # content_length
+        if len(columns[0]) >= BATCH_ROWS:
+            await write_batch()
         if byte_count >= 1_000_000_000: # 1 GB
-            print(f"Flushing {len(rows)} rows to parquet (1GB threshold)")
-            table = pl.DataFrame(rows)
-            timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
-            filename = f"pmc_text_{timestamp}.parquet"
-            pq.write_table(table.to_arrow(), filename)
-            print(f"Wrote {filename}")
-            rows.clear()
+            await rotate()
             byte_count = 0
-        queue.task_done()
+        for _ in drained:
+            queue.task_done()
+        if sentinel:
+            await rotate()
+            queue.task_done()
+            break
 
 
 
 
+PMC_FILELIST_URLS = [
+    'https://pmc-oa-opendata.s3.amazonaws.com/oa_comm/txt/metadata/csv/oa_comm.filelist.csv',
+    'https://pmc-oa-opendata.s3.amazonaws.com/oa_noncomm/txt/metadata/csv/oa_noncomm.filelist.csv',
+    #'https://pmc-oa-opendata.s3.amazonaws.com/author_manuscript/txt/metadata/csv/author_manuscript.filelist.csv',
+]
+
+
+def _download_filelist(url: str, dest: str) -> None:
+    """Stream one filelist CSV to disk without buffering it in memory."""
+    with httpx.stream("GET", url, follow_redirects=True, timeout=120.0) as resp:
+        resp.raise_for_status()
+        with open(dest, "wb") as out:
+            for chunk in resp.iter_bytes(8 << 20):
+                out.write(chunk)
+
+
 async def fetch_metadata_csv() -> pl.DataFrame:
     cache_file = 'ncbi_pmc_oa.filelist.parquet'
     try:
         df = pl.read_parquet(cache_file)
         return df
     except FileNotFoundError:
-        df = pl.read_csv('https://pmc-oa-opendata.s3.amazonaws.com/oa_comm/txt/metadata/csv/oa_comm.filelist.csv')
-        df_noncomm = pl.read_csv('https://pmc-oa-opendata.s3.amazonaws.com/oa_noncomm/txt/metadata/csv/oa_noncomm.filelist.csv')
-        #df_author_manuscript = pl.read_csv('https://pmc-oa-opendata.s3.amazonaws.com/author_manuscript/txt/metadata/csv/author_manuscript.filelist.csv')
-        #df = pl.concat([df, df_noncomm, df_author_manuscript])
-        df = pl.concat([df, df_noncomm])
-        df = df.unique()
-        df.write_parquet(cache_file)
-    return df
+        pass
+    # Stream each CSV to disk, then concat + dedupe as one lazy plan so
+    # polars' multi-threaded CSV reader handles parsing and the result
+    # sinks straight to parquet without an intermediate eager frame.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i, url in enumerate(PMC_FILELIST_URLS):
+            path = os.path.join(tmpdir, f"filelist_{i}.csv")
+            _download_filelist(url, path)
+            paths.append(path)
+        pl.concat([pl.scan_csv(p) for p in paths]).unique().sink_parquet(
+            cache_file, compression="zstd"
+        )
+    return pl.read_parquet(cache_file)
 
 
-async def key_generator(metadata_df: pl.DataFrame) -> dict[str, str]:
+def key_generator(metadata_df: pl.DataFrame):
+    """Yield candidate fetch items not yet downloaded, lazily.
+
+    The diff against previously-fetched keys runs as an anti-join inside
+    DuckDB (the old path materialized every prior key into a Python
+    set), and results stream out batch by batch through an Arrow reader,
+    so candidate key strings never all live in Python memory at once.
+    """
     bucket = "pmc-oa-opendata"
-    keys = metadata_df.select("Key").to_series().to_list()
-    existing_keys = set(pl.scan_parquet('pmc*.parquet').collect().select("key").to_series().to_list())
-    keys = [{"bucket": bucket, "key": k} for k in keys if k not in existing_keys]
-    return keys
+    if glob.glob("pmc*.parquet"):
+        reader = duckdb.sql("""
+            SELECT m."Key" AS key
+            FROM metadata_df m
+            ANTI JOIN read_parquet('pmc*.parquet') p ON m."Key" = p.key
+        """).fetch_arrow_reader()
+    else:
+        reader = duckdb.sql(
+            'SELECT m."Key" AS key FROM metadata_df m'
+        ).fetch_arrow_reader()
+    for batch in reader:
+        for k in batch.column("key").to_pylist():
+            yield {"bucket": bucket, "key": k}
 
 async def run():
-    reader_queue = asyncio.Queue()
-    writer_queue = asyncio.Queue()
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
-    rows = []
+    # Bounded queue: keys are pulled from the generator as workers free
+    # capacity, so queue-resident memory is O(2 * workers) rather than
+    # the whole candidate list
+    reader_queue = asyncio.Queue(maxsize=MAX_CONCURRENT_FETCHES * 2)
+    writer_queues = [asyncio.Queue() for _ in range(NUM_WRITERS)]
     metadata_df = await fetch_metadata_csv()
-    keys = await key_generator(metadata_df)
-    total_keys = len(keys)
-  
-    # Create httpx client with custom timeout settings
-    httpx_client = httpx.AsyncClient(timeout=60.0)
+
+    # Sized keep-alive pool + HTTP/2: connections are reused across the
+    # full key stream instead of paying a TLS handshake per object, and
+    # HTTP/2 multiplexes concurrent GETs over a handful of connections.
+    httpx_client = httpx.AsyncClient(
+        http2=True,
+        timeout=60.0,
+        limits=httpx.Limits(
+            max_connections=MAX_CONCURRENT_FETCHES * 2,
+            max_keepalive_connections=MAX_CONCURRENT_FETCHES * 2,
+        ),
+    )
     try:
-        # Create progress bar
-        pbar = tqdm(total=total_keys, desc="Fetching PMC texts", unit="file")
-        
-        # Create fetch workers
-        fetch_workers = [
-            asyncio.create_task(fetch_worker(reader_queue, writer_queue, semaphore, httpx_client, pbar))
-            for _ in range(30)
-        ]
-        
-        # Create write workers
-        write_workers = [
-            asyncio.create_task(write_worker(writer_queue, rows))
+        # Total is unknown up front since keys stream lazily
+        pbar = tqdm(desc="Fetching PMC texts", unit="file")
+
+        async def producer():
+            print("Starting to fetch from metadata")
+            for k in key_generator(metadata_df):
+                await reader_queue.put(k)
+            # one sentinel per fetch worker
+            for _ in range(MAX_CONCURRENT_FETCHES):
+                await reader_queue.put(None)
+
+        write_tasks = [
+            asyncio.create_task(write_worker(q, writer_id=i))
+            for i, q in enumerate(writer_queues)
         ]
 
-        print(f"Starting to fetch from metadata")
-        for k in keys:
-            await reader_queue.put(k)
+        # The TaskGroup exits once the producer has drained the key
+        # stream and every fetch worker has consumed its sentinel; an
+        # exception in any task cancels the rest instead of hanging.
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(MAX_CONCURRENT_FETCHES):
+                tg.create_task(
+                    fetch_worker(reader_queue, writer_queues, httpx_client, pbar)
+                )
+            tg.create_task(producer())
 
-        print("All items queued, waiting for readers...")
-        # Wait for all fetches to complete
-        await reader_queue.join()
-        print("All reads complete, signaling workers to stop...")
+        # All fetches are done; close out the writers
+        for q in writer_queues:
+            await q.put(None)
+        for task in write_tasks:
+            await task
 
-        # Signal fetch workers to stop
-        for _ in fetch_workers:
-            await reader_queue.put(None)
-        
-        try:
-            await asyncio.wait_for(asyncio.gather(*fetch_workers), timeout=30.0)
-        except asyncio.TimeoutError:
-            print("Timeout waiting for fetch workers")
-        
-        print("All fetch workers stopped, waiting for writers...")
-        # Wait for all writes to complete
-        await writer_queue.join()
-        
-        # Signal write workers to stop
-        for _ in write_workers:
-            await writer_queue.put(None)
-        
-        try:
-            await asyncio.wait_for(asyncio.gather(*write_workers), timeout=30.0)
-        except asyncio.TimeoutError:
-            print("Timeout waiting for write workers")
-        
+        fetched = pbar.n
         pbar.close()
-        print(f"Complete. Fetched {len(rows)} items")
+        print(f"Complete. Fetched {fetched} items")
     finally:
         await httpx_client.aclose()
 
-    return rows
-
 
 
 if __name__ == "__main__":
@@ -268,7 +268,7 @@ copy (
         data_types,
         external_links
     from read_ndjson_auto(
-            'r2://omicidx/biosample/biosample/raw/bioproject/raw/bioproject.jsonl.gz',
+            'r2://omicidx/biosample/biosample/raw/bioproject/raw/bioproject.jsonl.zst',
             maximum_object_size = 1000000000
         )
 ) to 'r2://omicidx/bioproject/parquet/bioprojects.parquet' (format parquet, compression zstd);
@@ -297,7 +297,7 @@ copy (
         attributes,
         trim(model) as model
     from read_ndjson_auto(
-            'r2://omicidx/biosample/biosample/raw/biosample/raw/biosample.jsonl.gz',
+            'r2://omicidx/biosample/biosample/raw/biosample/raw/biosample.jsonl.zst',
             maximum_object_size = 1000000000
         )
 ) to 'r2://omicidx/biosample/parquet/biosamples.parquet' (format parquet, compression zstd);
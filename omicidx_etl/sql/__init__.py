@@ -14,11 +14,36 @@ Usage:
     files = list_sql_files()
 """
 
+import functools
 from pathlib import Path
 
 SQL_DIR = Path(__file__).parent
 
 
+@functools.lru_cache(maxsize=None)
+def _transpile(sql: str) -> tuple[str, ...]:
+    """Split SQL into statements, cached on the exact file content.
+
+    Trailing semicolons and comment-only blocks come back from sqlglot
+    as empty strings; filtering them here saves a no-op parse+execute
+    round-trip per blank in every runner.
+    """
+    import sqlglot
+
+    return tuple(s for s in sqlglot.transpile(sql, read="duckdb") if s.strip())
+
+
+def get_statements(name: str) -> tuple[str, ...]:
+    """Load a SQL file and split it into individual statements.
+
+    sqlglot parsing is pure Python and costs tens of milliseconds on a
+    large file, so the transpile result is cached keyed by content —
+    repeated invocations within a process (run-all loops, tests) parse
+    each file once.
+    """
+    return _transpile(get_sql(name))
+
+
 def get_sql(name: str) -> str:
     """Load SQL file content by name.
 
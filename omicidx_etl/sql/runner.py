@@ -14,18 +14,41 @@ Usage (CLI):
     uv run oidx sql list
 """
 
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from ..log import logger
 
 import click
 import duckdb
 
-from omicidx_etl.sql import get_sql, list_sql_files
+from omicidx_etl.sql import get_statements, list_sql_files
 
+# Cursors running concurrent statements against one connection; DuckDB
+# releases the GIL during S3 reads and Arrow decode, which is where
+# consolidation statements spend their time.
+MAX_SQL_WORKERS = 8
 
+
+def _quote_literal(value: str) -> str:
+    """Render a value as a SQL single-quoted literal.
+
+    DuckDB does not accept prepared-statement parameters in DDL such as
+    CREATE SECRET, so credential values are escaped explicitly instead
+    of being interpolated raw.
+    """
+    return "'" + value.replace("'", "''") + "'"
+
+
+@functools.lru_cache(maxsize=1)
 def get_connection() -> duckdb.DuckDBPyConnection:
-    """Create a DuckDB connection with R2 credentials."""
+    """Create (once) a DuckDB connection with R2 credentials.
+
+    The configured connection is cached so CLI subcommands within a
+    process share it rather than paying reconnect + secret setup each
+    time.
+    """
     con = duckdb.connect()
     con.execute("INSTALL httpfs; LOAD httpfs;")
 
@@ -38,9 +61,9 @@ def get_connection() -> duckdb.DuckDBPyConnection:
         sql = f"""
 create or replace secret r2 (
     TYPE r2,
-    KEY_ID '{aws_access_key_id}',
-    SECRET '{aws_secret_access_key}',
-    ACCOUNT_ID '{aws_endpoint_url}'
+    KEY_ID {_quote_literal(aws_access_key_id)},
+    SECRET {_quote_literal(aws_secret_access_key)},
+    ACCOUNT_ID {_quote_literal(aws_endpoint_url)}
 );"""
         con.execute(sql)
         logger.info("R2 secret created successfully")
@@ -50,26 +73,125 @@ create or replace secret r2 (
         raise
 
 
+def _is_session_statement(stmt: str) -> bool:
+    """Return True for statements that mutate per-connection session state.
+
+    USE/SET/RESET only affect the connection they run on, and DuckDB
+    cursors do not inherit them from their parent connection, so the
+    runner records them for replay on each cursor.
+    """
+    head = stmt.lstrip().split(None, 1)
+    return bool(head) and head[0].upper() in {"USE", "SET", "RESET"}
+
+
+def _plan_batches(statements: list[str]) -> list[list[tuple[int, str]]]:
+    """Group statements into ordered batches of independent statements.
+
+    CREATE statements whose inputs were all produced by earlier batches
+    can run concurrently; a statement that reads (or re-creates) a table
+    produced within the current batch starts a new one. Anything that is
+    not a parseable CREATE (SET, COPY, ...) runs alone as a barrier,
+    which preserves serial semantics for statements we cannot analyze.
+    """
+    import sqlglot
+    from sqlglot import exp
+
+    batches: list[list[tuple[int, str]]] = []
+    current: list[tuple[int, str]] = []
+    produced: set[str] = set()
+    consumed: set[str] = set()
+
+    def flush():
+        nonlocal produced, consumed
+        if current:
+            batches.append(list(current))
+            current.clear()
+            produced = set()
+            consumed = set()
+
+    for i, stmt in enumerate(statements, 1):
+        creates: set[str] = set()
+        refs: set[str] = set()
+        barrier = True
+        try:
+            tree = sqlglot.parse_one(stmt, read="duckdb")
+        except sqlglot.errors.ParseError:
+            tree = None
+        if isinstance(tree, exp.Create):
+            table = tree.find(exp.Table)
+            if table is not None and table.name:
+                creates = {table.name}
+                refs = {t.name for t in tree.find_all(exp.Table) if t.name} - creates
+                barrier = False
+
+        if barrier:
+            flush()
+            batches.append([(i, stmt)])
+            continue
+        if (refs & produced) or (creates & (produced | consumed)):
+            flush()
+        current.append((i, stmt))
+        produced |= creates
+        consumed |= refs
+
+    flush()
+    return batches
+
+
 def run_sql_file(
     name: str,
     con: duckdb.DuckDBPyConnection | None = None,
 ) -> duckdb.DuckDBPyConnection:
-    """Run a SQL file, executing each statement individually."""
-    import sqlglot
-
+    """Run a SQL file, executing independent statements concurrently."""
     if con is None:
         con = get_connection()
 
-    sql = get_sql(name)
-    statements = sqlglot.transpile(sql, read="duckdb")
+    statements = list(get_statements(name))
+    total = len(statements)
 
-    logger.info(f"Running SQL file: {name} ({len(statements)} statements)")
+    logger.info(f"Running SQL file: {name} ({total} statements)")
 
-    for i, stmt in enumerate(statements, 1):
+    # Session statements (USE, SET, ...) run as barriers on the
+    # connection, but cursors start from a fresh session and do not see
+    # their effects — e.g. after USE geo, a CREATE VIEW on a cursor
+    # would land in main. Replaying them on every cursor keeps parallel
+    # batch members in the same catalog/settings as the connection.
+    session_statements: list[str] = []
+
+    def run_one(i: int, stmt: str, parallel: bool) -> None:
         preview = stmt[:120].replace("\n", " ")
-        logger.info(f"[{name}] Statement {i}/{len(statements)}: {preview}")
-        con.execute(stmt)
-        logger.info(f"[{name}] Statement {i}/{len(statements)} completed")
+        logger.info(f"[{name}] Statement {i}/{total}: {preview}")
+        if parallel:
+            # cursors share the connection's database and secrets but
+            # execute independently, so batch members overlap their S3 IO
+            cursor = con.cursor()
+            try:
+                for session_stmt in session_statements:
+                    cursor.execute(session_stmt)
+                cursor.execute(stmt)
+            finally:
+                cursor.close()
+        else:
+            # barriers (USE, SET, COPY, ...) run on the connection itself
+            # so session-level effects persist
+            con.execute(stmt)
+            if _is_session_statement(stmt):
+                session_statements.append(stmt)
+        logger.info(f"[{name}] Statement {i}/{total} completed")
+
+    for batch in _plan_batches(statements):
+        if len(batch) == 1:
+            i, stmt = batch[0]
+            run_one(i, stmt, parallel=False)
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_SQL_WORKERS, len(batch))
+            ) as executor:
+                futures = [
+                    executor.submit(run_one, i, stmt, True) for i, stmt in batch
+                ]
+                for future in futures:
+                    future.result()
 
     logger.info(f"Completed SQL file: {name}")
     return con
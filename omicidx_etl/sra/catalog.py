@@ -5,18 +5,38 @@ This module provides the SRACatalog class for managing the processing and cleanu
 of SRA mirror entries.
 """
 from typing import List
-from datetime import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+import functools
+import inspect
 import re
 
+import orjson
+
 from upath import UPath
 
 from ..log import get_logger, log_operation, LogProgress
 from .mirror import SRAMirrorEntry
-from .mirror_parquet import process_mirror_entry_to_parquet_parts
+from .mirror_parquet import UPLOAD_BLOCK_SIZE, process_mirror_entry_to_parquet_parts
 
 ENTITIES = ("study", "sample", "experiment", "run")
 
+# Concurrent workers for per-entry processing and cleanup; entries are
+# independent network-plus-write jobs
+MAX_ENTRY_WORKERS = 8
+
+# S3 DeleteObjects accepts up to 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+@functools.cache
+def _rm_takes_recursive_kw(fs_type: type) -> bool:
+    """Whether this filesystem's rm accepts recursive as a keyword."""
+    try:
+        return "recursive" in inspect.signature(fs_type.rm).parameters
+    except (TypeError, ValueError):
+        return True
+
 
 class SRACatalog:
     """
@@ -34,6 +54,10 @@ class SRACatalog:
             base_dir: Base directory for SRA data (e.g., 's3://omicidx/sra/raw')
         """
         self.base_dir = UPath(base_dir)
+        # remote writes are many small-to-medium parquet parts; a small
+        # multipart block size starts uploads sooner (see mirror_parquet)
+        if hasattr(self.base_dir.fs, "default_block_size"):
+            self.base_dir.fs.default_block_size = UPLOAD_BLOCK_SIZE
         self.log = get_logger(__name__)
 
     def _done_marker_path(self, mirror_entry: SRAMirrorEntry) -> UPath:
@@ -86,15 +110,63 @@ class SRACatalog:
         Args:
             p: Path to remove recursively
         """
-        if not p.exists():
-            return
-        
+        # no exists() precheck — the recursive rm lists the prefix
+        # anyway, so an absent path just surfaces as FileNotFoundError
         try:
-            p.fs.rm(p.path, recursive=True)
-        except TypeError:
-            # Some FS implementations don't accept recursive as kwarg
-            p.fs.rm(p.path, True)
+            if _rm_takes_recursive_kw(type(p.fs)):
+                p.fs.rm(p.path, recursive=True)
+            else:
+                p.fs.rm(p.path, True)
+        except FileNotFoundError:
+            pass
     
+    def _bulk_remove(self, paths: List[UPath]) -> int:
+        """Delete everything under the given paths with batched deletes.
+
+        Keys are listed concurrently, then removed in DeleteObjects-sized
+        batches — one round trip per 1000 keys instead of one per object.
+        Returns the number of objects deleted.
+        """
+        if not paths:
+            return 0
+        fs = paths[0].fs
+
+        def find_one(p: UPath) -> list[str]:
+            try:
+                if p.is_file():
+                    return [p.path]
+                return list(fs.find(p.path))
+            except (FileNotFoundError, OSError):
+                return []
+
+        keys: list[str] = []
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_ENTRY_WORKERS, len(paths))
+        ) as executor:
+            for found in executor.map(find_one, paths):
+                keys.extend(found)
+
+        for i in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[i : i + DELETE_BATCH_SIZE]
+            try:
+                fs.rm(batch)
+            except Exception as e:
+                self.log.error(
+                    "Failed to delete batch",
+                    batch_size=len(batch),
+                    error=str(e),
+                )
+
+        # prune now-empty directory stubs (object stores have none)
+        for p in paths:
+            try:
+                if p.is_dir():
+                    self._rm_tree(p)
+            except (FileNotFoundError, OSError):
+                pass
+
+        return len(keys)
+
     def cleanup_one(self, mirror_entry: SRAMirrorEntry) -> None:
         """
         Remove all stored artifacts for a mirror entry (entire directory/prefix).
@@ -239,27 +311,19 @@ class SRACatalog:
             entities=sorted(entities_to_clean),
         )
 
-        progress = LogProgress(
-            self.log,
-            total=len(to_cleanup),
-            operation="cleanup_entries",
-            log_every=10,
-        )
-
-        for entry in to_cleanup:
-            try:
-                self.cleanup_one(entry)
-                progress.update()
-            except Exception as e:
-                self.log.error(
-                    "Failed to cleanup entry",
-                    url=entry.url,
-                    entity=entry.entity,
-                    error=str(e),
-                    exc_info=True,
-                )
-
-        progress.complete()
+        # Collect every target path up front and delete in multi-key
+        # batches rather than one recursive rm per entry
+        if to_cleanup:
+            targets: list[UPath] = []
+            for entry in to_cleanup:
+                targets.append(self.parquet_dir_for_mirror_entry(entry))
+                targets.append(self.path_for_mirror_entry(entry))
+            deleted = self._bulk_remove(targets)
+            self.log.info(
+                "Removed mirror-entry artifacts",
+                entries=len(to_cleanup),
+                objects_deleted=deleted,
+            )
 
         # Pass 2: filesystem-based cleanup for residual directories
         total_residual = 0
@@ -274,23 +338,89 @@ class SRACatalog:
                 residual_removed=total_residual,
             )
     
-    def process_one(self, mirror_entry: SRAMirrorEntry) -> None:
+    def _part_manifest(self, parts: List[UPath]) -> dict:
+        """Summarize written parquet parts for the done marker.
+
+        Per file: row count, row-group count, and min/max for top-level
+        columns that carry statistics. Consumers can then prune whole
+        files from the marker alone instead of opening parquet footers.
+        """
+        import pyarrow.parquet as pq
+
+        manifest: dict = {}
+        for part in parts:
+            try:
+                with part.open("rb") as f:
+                    md = pq.ParquetFile(f).metadata
+            except Exception as e:
+                self.log.warning(
+                    "Could not read part metadata", part=str(part), error=str(e)
+                )
+                continue
+            columns: dict = {}
+            for ci in range(md.num_columns if md.num_row_groups else 0):
+                name = md.row_group(0).column(ci).path_in_schema
+                if "." in name:
+                    continue  # nested columns have no useful scalar range
+                mins, maxs = [], []
+                for ri in range(md.num_row_groups):
+                    stats = md.row_group(ri).column(ci).statistics
+                    if stats is None or not stats.has_min_max:
+                        break
+                    mins.append(stats.min)
+                    maxs.append(stats.max)
+                if len(mins) == md.num_row_groups and mins:
+                    lo, hi = min(mins), max(maxs)
+                    if isinstance(lo, (str, int, float, bool)):
+                        columns[name] = {"min": lo, "max": hi}
+            manifest[part.name] = {
+                "num_rows": md.num_rows,
+                "row_groups": md.num_row_groups,
+                "columns": columns,
+            }
+        return manifest
+
+    def _list_done_markers(self) -> set[str] | None:
+        """List all done-marker paths under the base dir in one pass.
+
+        One glob replaces a HEAD per entry when processing a batch.
+        Returns None if the listing fails, in which case callers fall
+        back to per-marker existence checks.
+        """
+        pattern = f"{self.base_dir.path}/*/date=*/stage=*/data.done"
+        try:
+            return set(self.base_dir.fs.glob(pattern))
+        except Exception as e:
+            self.log.warning("Could not pre-list done markers", error=str(e))
+            return None
+
+    def process_one(
+        self,
+        mirror_entry: SRAMirrorEntry,
+        existing_done: set[str] | None = None,
+    ) -> None:
         """
         Process a single mirror entry and write parquet parts.
-        
+
         Args:
             mirror_entry: The SRA mirror entry to process
+            existing_done: Pre-listed done-marker paths; when given, the
+                per-entry marker existence check becomes a set lookup
         """
         log = self.log.bind(
             entity=mirror_entry.entity,
             date=str(mirror_entry.date),
             stage="Full" if mirror_entry.is_full else "Incremental",
         )
-        
+
         out_dir = self.parquet_dir_for_mirror_entry(mirror_entry)
         done_marker = self._done_marker_path(mirror_entry)
 
-        if done_marker.exists():
+        if (
+            done_marker.path in existing_done
+            if existing_done is not None
+            else done_marker.exists()
+        ):
             log.info(
                 f"Skipping entry; done marker exists {done_marker}, {mirror_entry.url}, {out_dir}"
             )
@@ -308,34 +438,46 @@ class SRACatalog:
             # Create completion marker with a small amount of metadata
             out_dir.mkdir(parents=True, exist_ok=True)
             marker_payload = {
-                "completed_at": datetime.utcnow().isoformat() + "Z",
+                "completed_at": datetime.now(timezone.utc).isoformat(),
                 "url": mirror_entry.url,
                 "entity": mirror_entry.entity,
                 "date": str(mirror_entry.date),
                 "is_full": mirror_entry.is_full,
                 "parts_written": len(written_parts),
+                "files": self._part_manifest(written_parts),
             }
-            with done_marker.open("w") as fp:
-                json.dump(marker_payload, fp)
+            # pipe issues one plain PUT for the tiny marker instead of
+            # going through the buffered multipart upload path
+            done_marker.fs.pipe(done_marker.path, orjson.dumps(marker_payload))
             log.info("Wrote done marker", marker=str(done_marker))
     
     def process(self, mirror_entries: List[SRAMirrorEntry]) -> None:
         """
         Process the SRA mirror entries and store them in the catalog.
-        
+
         Only processes entries that are in the current batch.
-        
+
         Args:
             mirror_entries: List of all mirror entries
         """
-        current_batch = [e for e in mirror_entries if e.in_current_batch]
-        
+        self.process_batch([e for e in mirror_entries if e.in_current_batch])
+
+    def process_batch(self, current_batch: List[SRAMirrorEntry]) -> None:
+        """
+        Process an already-filtered list of current-batch entries.
+
+        Callers that have filtered on in_current_batch themselves (the
+        CLI does, for its own logging) can pass the batch straight in
+        without process() re-scanning the full entry list.
+
+        Args:
+            current_batch: Mirror entries to process
+        """
         self.log.info(
             "Starting batch processing",
-            total_entries=len(mirror_entries),
             current_batch=len(current_batch),
         )
-        
+
         progress = LogProgress(
             self.log,
             total=len(current_batch),
@@ -343,20 +485,32 @@ class SRACatalog:
             log_every=1,  # Log every entry since there are typically few
         )
         
+        # entries are independent fetch+compress jobs, so a small worker
+        # pool overlaps one entry's download with another's parquet write
         failures = []
-        for entry in current_batch:
-            try:
-                self.process_one(entry)
-                progress.update()
-            except Exception as e:
-                failures.append(entry.entity)
-                self.log.error(
-                    "Failed to process entry — continuing with remaining entities",
-                    url=entry.url,
-                    entity=entry.entity,
-                    error=str(e),
-                    exc_info=True,
-                )
+        if current_batch:
+            existing_done = self._list_done_markers()
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_ENTRY_WORKERS, len(current_batch))
+            ) as executor:
+                futures = {
+                    executor.submit(self.process_one, e, existing_done): e
+                    for e in current_batch
+                }
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    try:
+                        future.result()
+                        progress.update()
+                    except Exception as e:
+                        failures.append(entry.entity)
+                        self.log.error(
+                            "Failed to process entry — continuing with remaining entities",
+                            url=entry.url,
+                            entity=entry.entity,
+                            error=str(e),
+                            exc_info=True,
+                        )
 
         progress.complete()
 
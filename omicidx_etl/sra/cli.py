@@ -147,7 +147,9 @@ def extract(
         log.info("Processing entries")
         process_error = None
         try:
-            catalog.process(filtered_entries)
+            # current_batch was already filtered above for logging; pass
+            # it straight in rather than having process() re-filter
+            catalog.process_batch(current_batch)
         except RuntimeError as e:
             # Partial failure — some entities succeeded, some failed.
             # Continue to cleanup for the ones that succeeded.
@@ -251,11 +253,12 @@ def list_entries_text(entries: list[SRAMirrorEntry]) -> str:
 
 def list_entries_json(entries: list[SRAMirrorEntry]) -> str:
     """Helper function to format a list of entries as JSON."""
-    import json
-    entries = [e.__dict__ for e in entries] # type: ignore
-    for e in entries:
-        e['date'] = str(e['date'])          # type: ignore
-    return json.dumps(entries, indent=2)
+    import orjson
+    # orjson serializes date objects natively, so no per-entry str()
+    # conversion pass is needed
+    return orjson.dumps(
+        [e.__dict__ for e in entries], option=orjson.OPT_INDENT_2
+    ).decode()
 
 @sra.command()
 @click.option(
@@ -5,12 +5,26 @@ This module provides classes and functions for working with NCBI SRA mirror file
 including parsing mirror URLs and determining which files to process.
 """
 import datetime
+import functools
+import json
 import re
+import time
+from pathlib import Path
 from typing import List
 
 from upath import UPath
 from loguru import logger
 
+# compiled once: these run per entry on every listing of the mirror
+_DATE_RE = re.compile(r'NCBI_SRA_Mirroring_(\d{8})')
+_ENTITY_RE = re.compile(r'meta_(study|sample|experiment|run)_set')
+
+# the HTTP walk of the mirror tree is hundreds of requests; the file
+# list is cached on disk so back-to-back CLI commands (extract then
+# cleanup) pay for it once
+_LISTING_CACHE = Path.home() / ".cache" / "omicidx" / "mirror_entries.json"
+_LISTING_TTL_SECONDS = 3600
+
 
 class SRAMirrorEntry:
     """
@@ -54,16 +68,10 @@ class SRAMirrorEntry:
     
     def _extract_sra_entity(self) -> None:
         """Extract the SRA entity type from the URL."""
-        if 'study' in self.url:
-            self.entity = 'study'
-        elif 'sample' in self.url:
-            self.entity = 'sample'
-        elif 'experiment' in self.url:
-            self.entity = 'experiment'
-        elif 'run' in self.url:
-            self.entity = 'run'
-        else:
+        match = _ENTITY_RE.search(self.url)
+        if not match:
             raise ValueError(f"Unknown SRA entity in URL: {self.url}")
+        self.entity = match.group(1)
     
     def _is_full_file(self) -> None:
         """Determine if this is a full or incremental file."""
@@ -78,18 +86,47 @@ class SRAMirrorEntry:
         Raises:
             ValueError: If date pattern is not found in URL
         """
-        match = re.search(r'NCBI_SRA_Mirroring_(\d{8})', self.url)
+        match = _DATE_RE.search(self.url)
         if not match:
             raise ValueError(f"Could not extract date from URL: {self.url}")
-        
-        date_str = match.group(1)  # e.g., '20251206'
-        self.date = datetime.datetime.strptime(date_str, '%Y%m%d').date()
+
+        s = match.group(1)  # e.g., '20251206'
+        # slicing a \d{8} match is several times faster than strptime
+        self.date = datetime.date(int(s[:4]), int(s[4:6]), int(s[6:8]))
     
     def _in_current_batch(self) -> None:
         """Initialize the current batch flag (set by get_sra_mirror_entries)."""
         self.in_current_batch = False
 
 
+@functools.lru_cache(maxsize=1)
+def _list_mirror_files() -> tuple[str, ...]:
+    """
+    List all mirror file URLs, newest first, with a short-TTL disk cache.
+
+    Only the URL list is cached — entry objects carry mutable batch
+    state and are rebuilt per call.
+    """
+    try:
+        if time.time() - _LISTING_CACHE.stat().st_mtime < _LISTING_TTL_SECONDS:
+            cached = json.loads(_LISTING_CACHE.read_text())
+            logger.info(f"Using cached mirror listing ({len(cached)} files)")
+            return tuple(cached)
+    except (OSError, ValueError):
+        pass
+
+    up = UPath("https://ftp.ncbi.nlm.nih.gov/sra/reports/Mirroring/")
+    all_files = tuple(reversed([str(f) for f in up.glob("**/*set.xml.gz")]))
+
+    try:
+        _LISTING_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        _LISTING_CACHE.write_text(json.dumps(list(all_files)))
+    except OSError:
+        # cache is best-effort; the listing still works without it
+        pass
+    return all_files
+
+
 def get_sra_mirror_entries() -> List[SRAMirrorEntry]:
     """
     Fetch the SRA mirror entries from the SRA mirror file URLs.
@@ -103,10 +140,9 @@ def get_sra_mirror_entries() -> List[SRAMirrorEntry]:
         List of SRAMirrorEntry objects with in_current_batch flag set appropriately
     """
     logger.info("Fetching SRA mirror entries")
-    
-    up = UPath("https://ftp.ncbi.nlm.nih.gov/sra/reports/Mirroring/")
-    all_files = list(reversed([str(f) for f in up.glob("**/*set.xml.gz")]))
-    
+
+    all_files = _list_mirror_files()
+
     logger.info(f"Found {len(all_files)} total mirror files")
     
     found_full = False
@@ -117,7 +153,7 @@ def get_sra_mirror_entries() -> List[SRAMirrorEntry]:
         try:
             sra_mirror_entry = SRAMirrorEntry(url)
         except ValueError as e:
-            logger.debug(f"Skipping URL due to parse error: {e}")
+            logger.debug("Skipping URL due to parse error: {}", e)
             continue
         
         # Mark the first Full file we encounter
@@ -8,87 +8,92 @@ from typing import Dict
 import pyarrow as pa
 
 
-def get_pyarrow_schema(schema_name: str) -> pa.Schema:
-    """Get PyArrow schema definitions for each SRA record type.
-
-    Returns an empty dict if `pyarrow` is not available so callers can
-    import this module safely in minimal environments.
-    """
-
-    # Common nested types
-    identifier_type = pa.struct([
-        ("namespace", pa.string()),
-        ("id", pa.string()),
-        ("uuid", pa.string())
-    ])
-
-    attribute_type = pa.struct([
-        ("tag", pa.string()),
-        ("value", pa.string())
-    ])
-
-    xref_type = pa.struct([
-        ("db", pa.string()),
-        ("id", pa.string())
-    ])
-
-    file_alternative_type = pa.struct([
-        ("url", pa.string()),
-        ("free_egress", pa.string()),
-        ("access_type", pa.string()),
-        ("org", pa.string())
-    ])
-
-    file_type = pa.struct([
-        ("cluster", pa.string()),
-        ("filename", pa.string()),
-        ("url", pa.string()),
-        ("size", pa.int64()),
-        ("date", pa.string()),
-        ("md5", pa.string()),
-        ("sratoolkit", pa.string()),
-        ("alternatives", pa.list_(file_alternative_type))
-    ])
-
-    run_read_type = pa.struct([
-        ("index", pa.int64()),
-        ("count", pa.int64()),
-        ("mean_length", pa.float64()),
-        ("sd_length", pa.float64())
-    ])
-
-    base_count_type = pa.struct([
-        ("base", pa.string()),
-        ("count", pa.int64())
-    ])
-
-    quality_type = pa.struct([
-        ("quality", pa.int32()),
-        ("count", pa.int64())
-    ])
-
-    tax_count_entry_type = pa.struct([
-        ("rank", pa.string()),
-        ("name", pa.string()),
-        ("parent", pa.int32()),
-        ("total_count", pa.int64()),
-        ("self_count", pa.int64()),
-        ("tax_id", pa.int32())
-    ])
-
-    tax_analysis_type = pa.struct([
-        ("nspot_analyze", pa.int64()),
-        ("total_spots", pa.int64()),
-        ("mapped_spots", pa.int64()),
-        ("tax_counts", pa.list_(tax_count_entry_type))
-    ])
-
-    experiment_read_type = pa.struct([
-        ("base_coord", pa.int64()),
-        ("read_class", pa.string()),
-        ("read_index", pa.int64()),
-        ("read_type", pa.string())
-    ])
+# Nested building-block types, constructed once at import; Arrow types
+# are immutable, so they are safe to share across schemas and other
+# extraction modules
+_identifier_type = pa.struct([
+    ("namespace", pa.string()),
+    ("id", pa.string()),
+    ("uuid", pa.string())
+])
+
+_attribute_type = pa.struct([
+    ("tag", pa.string()),
+    ("value", pa.string())
+])
+
+_xref_type = pa.struct([
+    ("db", pa.string()),
+    ("id", pa.string())
+])
+
+_file_alternative_type = pa.struct([
+    ("url", pa.string()),
+    ("free_egress", pa.string()),
+    ("access_type", pa.string()),
+    ("org", pa.string())
+])
+
+_file_type = pa.struct([
+    ("cluster", pa.string()),
+    ("filename", pa.string()),
+    ("url", pa.string()),
+    ("size", pa.int64()),
+    ("date", pa.string()),
+    ("md5", pa.string()),
+    ("sratoolkit", pa.string()),
+    ("alternatives", pa.list_(_file_alternative_type))
+])
+
+_run_read_type = pa.struct([
+    ("index", pa.int64()),
+    ("count", pa.int64()),
+    ("mean_length", pa.float64()),
+    ("sd_length", pa.float64())
+])
+
+_base_count_type = pa.struct([
+    ("base", pa.string()),
+    ("count", pa.int64())
+])
+
+_quality_type = pa.struct([
+    ("quality", pa.int32()),
+    ("count", pa.int64())
+])
+
+_tax_count_entry_type = pa.struct([
+    ("rank", pa.string()),
+    ("name", pa.string()),
+    ("parent", pa.int32()),
+    ("total_count", pa.int64()),
+    ("self_count", pa.int64()),
+    ("tax_id", pa.int32())
+])
+
+_tax_analysis_type = pa.struct([
+    ("nspot_analyze", pa.int64()),
+    ("total_spots", pa.int64()),
+    ("mapped_spots", pa.int64()),
+    ("tax_counts", pa.list_(_tax_count_entry_type))
+])
+
+_experiment_read_type = pa.struct([
+    ("base_coord", pa.int64()),
+    ("read_class", pa.string()),
+    ("read_index", pa.int64()),
+    ("read_type", pa.string())
+])
+
+# public aliases for builders outside this module that write these
+# common shapes
+IDENTIFIER_TYPE = _identifier_type
+ATTRIBUTE_TYPE = _attribute_type
+XREF_TYPE = _xref_type
+
+
+def _build_schemas() -> Dict[str, pa.Schema]:
+    """Build the immutable per-entity schemas; runs once at import."""
 
     # Schema for SRA Run records
     run_schema = pa.schema([
@@ -100,13 +105,13 @@ def get_pyarrow_schema(schema_name: str) -> pa.Schema:
         ("total_bases", pa.int64()),
         ("size", pa.int64()),
         ("avg_length", pa.float64()),
-        ("identifiers", pa.list_(identifier_type)),
-        ("attributes", pa.list_(attribute_type)),
-        ("files", pa.list_(file_type)),
-        ("reads", pa.list_(run_read_type)),
-        ("base_counts", pa.list_(base_count_type)),
-        ("qualities", pa.list_(quality_type)),
-        ("tax_analysis", tax_analysis_type)
+        ("identifiers", pa.list_(_identifier_type)),
+        ("attributes", pa.list_(_attribute_type)),
+        ("files", pa.list_(_file_type)),
+        ("reads", pa.list_(_run_read_type)),
+        ("base_counts", pa.list_(_base_count_type)),
+        ("qualities", pa.list_(_quality_type)),
+        ("tax_analysis", _tax_analysis_type)
     ])
 
     # Schema for SRA Study records
@@ -122,9 +127,9 @@ def get_pyarrow_schema(schema_name: str) -> pa.Schema:
         ("broker_name", pa.string()),
         ("BioProject", pa.string()),
         ("GEO", pa.string()),
-        ("identifiers", pa.list_(identifier_type)),
-        ("attributes", pa.list_(attribute_type)),
-        ("xrefs", pa.list_(xref_type)),
+        ("identifiers", pa.list_(_identifier_type)),
+        ("attributes", pa.list_(_attribute_type)),
+        ("xrefs", pa.list_(_xref_type)),
         ("pubmed_ids", pa.list_(pa.string()))
     ])
 
@@ -138,9 +143,9 @@ def get_pyarrow_schema(schema_name: str) -> pa.Schema:
         ("taxon_id", pa.int32()),
         ("geo", pa.string()),
         ("BioSample", pa.string()),
-        ("identifiers", pa.list_(identifier_type)),
-        ("attributes", pa.list_(attribute_type)),
-        ("xrefs", pa.list_(xref_type))
+        ("identifiers", pa.list_(_identifier_type)),
+        ("attributes", pa.list_(_attribute_type)),
+        ("xrefs", pa.list_(_xref_type))
     ])
 
     # Schema for SRA Experiment records
@@ -167,17 +172,30 @@ def get_pyarrow_schema(schema_name: str) -> pa.Schema:
         ("library_selection", pa.string()),
         ("spot_length", pa.int64()),
         ("nreads", pa.int64()),
-        ("identifiers", pa.list_(identifier_type)),
-        ("attributes", pa.list_(attribute_type)),
-        ("xrefs", pa.list_(xref_type)),
-        ("reads", pa.list_(experiment_read_type))
+        ("identifiers", pa.list_(_identifier_type)),
+        ("attributes", pa.list_(_attribute_type)),
+        ("xrefs", pa.list_(_xref_type)),
+        ("reads", pa.list_(_experiment_read_type))
     ])
 
-    schemas = {
+    return {
         "run": run_schema,
         "study": study_schema,
         "sample": sample_schema,
         "experiment": experiment_schema
     }
-    
-    return schemas.get(schema_name, pa.schema([]))
+
+
+# built once: the schemas are immutable, and rebuilding the nested
+# struct/list types on every call was pure allocation churn
+PYARROW_SCHEMAS: Dict[str, pa.Schema] = _build_schemas()
+_EMPTY_SCHEMA = pa.schema([])
+
+
+def get_pyarrow_schema(schema_name: str) -> pa.Schema:
+    """Get the PyArrow schema for an SRA record type.
+
+    Returns an empty schema for unknown names so callers can treat the
+    lookup as total.
+    """
+    return PYARROW_SCHEMAS.get(schema_name, _EMPTY_SCHEMA)
@@ -30,11 +30,7 @@ import omicidx_etl.geo.extract as geo_extract
 
 def _make_paths(tmp_path: UPath, start: date, end: date):
     """Return the three output paths for a month, as local UPaths."""
-    old_output = geo_extract.OUTPUT_PATH
-    geo_extract.OUTPUT_PATH = UPath(tmp_path)
-    gse, gsm, gpl = geo_extract.get_result_paths(start, end)
-    geo_extract.OUTPUT_PATH = old_output
-    return gse, gsm, gpl
+    return geo_extract.get_result_paths(start, end, UPath(tmp_path))
 
 
 # ---------------------------------------------------------------------------
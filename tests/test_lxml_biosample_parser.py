@@ -0,0 +1,58 @@
+"""Tests for the lxml-based BioSample parser.
+
+The lxml parser is a performance drop-in for omicidx.biosample.BioSampleParser,
+so the key property is that both produce identical dict records.
+"""
+
+import io
+
+from omicidx.biosample import BioSampleParser
+
+from omicidx_etl.biosample.lxml_parser import LxmlBioSampleParser
+
+SAMPLE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<BioSampleSet>
+  <BioSample access="public" publication_date="2020-01-02T00:00:00.000"
+             last_update="2020-03-04T00:00:00.000"
+             submission_date="2020-01-01T00:00:00.000"
+             id="12345" accession="SAMN00012345">
+    <Ids>
+      <Id db="BioSample" is_primary="1">SAMN00012345</Id>
+      <Id db="SRA">SRS000001</Id>
+      <Id db="GEO">GSM000001</Id>
+    </Ids>
+    <Description>
+      <Title>Example sample</Title>
+      <Organism taxonomy_id="9606" taxonomy_name="Homo sapiens"/>
+      <Comment><Paragraph>An example description.</Paragraph></Comment>
+    </Description>
+    <Models><Model>Generic</Model></Models>
+    <Attributes>
+      <Attribute attribute_name="tissue" harmonized_name="tissue"
+                 display_name="tissue">liver</Attribute>
+      <Attribute attribute_name="custom thing">value</Attribute>
+    </Attributes>
+  </BioSample>
+</BioSampleSet>
+"""
+
+
+def _parse_with(parser_class) -> list[dict]:
+    return list(parser_class(io.BytesIO(SAMPLE_XML), validate_with_schema=False))
+
+
+def test_lxml_parser_matches_stdlib_parser():
+    lxml_records = _parse_with(LxmlBioSampleParser)
+    stdlib_records = _parse_with(BioSampleParser)
+    assert lxml_records == stdlib_records
+
+
+def test_lxml_parser_extracts_xrefs_and_attributes():
+    (record,) = _parse_with(LxmlBioSampleParser)
+    assert record["accession"] == "SAMN00012345"
+    assert record["sra_sample"] == "SRS000001"
+    assert record["gsm"] == "GSM000001"
+    assert record["dbgap"] is None
+    assert record["taxon_id"] == 9606
+    assert record["attributes"] == ["tissue", "custom thing"]
+    assert record["title"] == "Example sample"
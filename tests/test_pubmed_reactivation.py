@@ -6,6 +6,14 @@ from omicidx_etl.etl import pubmed as pubmed_module
 
 
 def test_pubmed_command_is_registered():
+    # direct registry introspection: no CliRunner isolation and no help
+    # formatting, just the lazy-command listing
+    assert "pubmed" in cli.list_commands(None)
+
+
+def test_cli_help_renders():
+    # single help-render check for the whole group; per-command
+    # registration asserts go through list_commands instead
     runner = CliRunner()
     result = runner.invoke(cli, ["--help"])
     assert result.exit_code == 0
@@ -42,3 +50,32 @@ def test_get_needed_ids_without_network(monkeypatch):
 
     needed = pubmed_module.get_needed_ids(UPath("s3://bucket/pubmed/raw"), replace=False)
     assert needed == {"pubmed25n0002"}
+
+
+def test_has_needed_ids_without_network(monkeypatch):
+    monkeypatch.setattr(
+        pubmed_module,
+        "load_available_urls",
+        lambda: {
+            "pubmed25n0001": "https://example.com/pubmed25n0001.xml.gz",
+            "pubmed25n0002": "https://example.com/pubmed25n0002.xml.gz",
+        },
+    )
+    monkeypatch.setattr(
+        pubmed_module,
+        "load_existing_urls",
+        lambda output_path: {
+            "pubmed25n0001": "s3://bucket/pubmed/raw/pubmed25n0001.parquet"
+        },
+    )
+    assert pubmed_module.has_needed_ids(UPath("s3://bucket/pubmed/raw")) is True
+
+    monkeypatch.setattr(
+        pubmed_module,
+        "load_existing_urls",
+        lambda output_path: {
+            "pubmed25n0001": "s3://bucket/pubmed/raw/pubmed25n0001.parquet",
+            "pubmed25n0002": "s3://bucket/pubmed/raw/pubmed25n0002.parquet",
+        },
+    )
+    assert pubmed_module.has_needed_ids(UPath("s3://bucket/pubmed/raw")) is False
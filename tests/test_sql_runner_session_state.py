@@ -0,0 +1,31 @@
+import duckdb
+
+from omicidx_etl.sql.runner import run_sql_file
+
+
+def test_use_schema_applies_to_parallel_batch(tmp_path):
+    # three independent CREATE VIEWs form one parallel batch that runs
+    # on cursors; without replaying the preceding USE on each cursor,
+    # every view would silently land in main
+    sql_file = tmp_path / "views.sql"
+    sql_file.write_text(
+        """
+        CREATE SCHEMA geo;
+        USE geo;
+        CREATE OR REPLACE VIEW one AS SELECT 1 AS x;
+        CREATE OR REPLACE VIEW two AS SELECT 2 AS x;
+        CREATE OR REPLACE VIEW three AS SELECT 3 AS x;
+        """
+    )
+
+    con = duckdb.connect()
+    try:
+        run_sql_file(str(sql_file), con=con)
+        rows = con.execute(
+            "SELECT schema_name FROM duckdb_views()"
+            " WHERE view_name IN ('one', 'two', 'three')"
+        ).fetchall()
+        assert len(rows) == 3
+        assert {schema for (schema,) in rows} == {"geo"}
+    finally:
+        con.close()